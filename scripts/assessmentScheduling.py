@@ -50,6 +50,10 @@ Candidate Goal - September 18	0	0	0	0	14
 Candidate Goal - October   18	0	0	0	0	13
 Candidate Goal - November   9	0	0	0	0	20
 Candidate Goal - December	3	0	0	0	0	6
+Program Activities	                  ROLEPLAY1, DATACASE, PAPI1	(optional, per program)
+Program Candidates	                  3	(optional, per program)
+Note: Every column after Value is a program. Without the optional rows a program gets the activities and candidates of PROGRAM_DEFAULTS (functionScript).
+Programs only get variables in the months where they have a goal.
 """
 import os
 import sys
@@ -58,8 +62,12 @@ import tkinter.font as tkFont
 from tkinter import filedialog, END
 import tkinter.messagebox as messagebox
 from tkcalendar import Calendar
-from functionScript import makeSchedule
+from functionScript import makeSchedule, replanSchedule, weightSweep, saveSchedule, prepareInput
+from solveProgress import SolveProgress
+from runReport import RunReport
+from solverSettings import SOLVER_PRESETS, DEFAULT_PRESET
 from availability import retrieve_calenders
+from inputCache import cached_load_data
 import pandas as pd
 from datetime import datetime, date
 import xlsxwriter #For active formulas in output sheet
@@ -86,16 +94,84 @@ def set_slider_color(value):
     index = min(int(value / step_size), 14)  # Calculate index (0–14)
     slider.configure(progress_color=colors[index])
 
+def preset_callback(preset):
+    # Show the defaults of the chosen preset, the user can still override them
+    deterministic_var.set(SOLVER_PRESETS[preset]['deterministic'])
+    workers_entry_var.set(str(SOLVER_PRESETS[preset]['workers']))
+    seed_entry_var.set(str(SOLVER_PRESETS[preset]['seed']))
+    relative_gap = SOLVER_PRESETS[preset].get('relative_gap')
+    gap_entry_var.set(f"{relative_gap * 100:g}" if relative_gap is not None else "")
+    no_improvement_entry_var.set(str(SOLVER_PRESETS[preset].get('no_improvement_time') or ""))
+
+def get_solver_settings():
+    solver_settings = {'preset': solver_preset_var.get(), 'deterministic': deterministic_var.get(), 'optimal_or_bust': optimal_or_bust_var.get(),
+                       'objective': 'lexicographic' if goals_first_var.get() else 'weighted'}
+    try:
+        if workers_entry_var.get().strip():
+            solver_settings['workers'] = int(workers_entry_var.get())
+        if seed_entry_var.get().strip():
+            solver_settings['seed'] = int(seed_entry_var.get())
+        if gap_entry_var.get().strip():
+            solver_settings['relative_gap'] = float(gap_entry_var.get()) / 100
+        if no_improvement_entry_var.get().strip():
+            solver_settings['no_improvement_time'] = float(no_improvement_entry_var.get())
+    except ValueError:
+        log_message("Workers, seed, gap and no-improvement time should be numbers, using the preset values instead")
+    return solver_settings
+
+def stop_scheduling():
+    # Accept the best schedule found so far instead of waiting for the time limit
+    if current_progress is not None:
+        log_message("Stopping search, keeping the best schedule found so far...")
+        current_progress.stop()
+
 def start_scheduling_threaded():
     # Start the scheduling process in a separate thread to avoid freezing of GUI
     scheduling_thread = threading.Thread(target=start_scheduling, daemon=True) #daemon prevents lingering threads background after closing
     scheduling_thread.start()
     
+def start_sweep():
+    # Solve the goal weights of SWEEP_WEIGHTS side by side and save the Pareto front with the schedule of every trade-off on it
+    selectedFile = file_entry.get()
+    startDate = start_date_cal.get_date()
+    endDate = end_date_cal.get_date()
+    if not isinstance(startDate, date):
+        startDate = datetime.strptime(startDate, '%m/%d/%y').date()
+    if not isinstance(endDate, date):
+        endDate = datetime.strptime(endDate, '%m/%d/%y').date()
+
+    # Threads instead of processes: this GUI script can't be re-imported by child processes
+    front, schedules = weightSweep(startDate, endDate, selectedFile, output_text, check_calender=check_calender_var.get(),
+                                   solver_settings=get_solver_settings(), use_threads=True)
+    log_message(f"Pareto front (pick a weight and set it on the slider):\n{front.to_string(index=False)}")
+    if front.empty:
+        return
+
+    f = filedialog.asksaveasfilename(defaultextension=".xlsx",
+                                     initialfile=f"Weight sweep {startDate} to {endDate} - {datetime.now().strftime('%d%m%H%M')}.xlsx",
+                                     filetypes=[("Excel files", "*.xlsx"), ("All files", "*.*")])
+    if not f:
+        return
+    with pd.ExcelWriter(f) as writer:
+        front.to_excel(writer, sheet_name='Pareto Front', index=False)
+        for weight, (solutionDf, capacityUsage, goal_comparison_df, scheduleText) in schedules.items():
+            solutionDf.to_excel(writer, sheet_name=f'Schedule w={weight:g}', index=False)
+    os.startfile(f)
+
+def start_sweep_threaded():
+    sweep_thread = threading.Thread(target=start_sweep, daemon=True)
+    sweep_thread.start()
+
 def open_file():
     file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls")])
     if file_path:
         file_entry_var.set(file_path)
         
+def open_hint_file():
+    file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx;*.xls")])
+    if file_path:
+        hint_entry_var.set(file_path)
+
 def log_message(message):
     output_text.configure(state='normal')  # Enable editing
     output_text.insert(END, f"{message}\n")  # Insert message at the end
@@ -104,14 +180,16 @@ def log_message(message):
     output_text.update_idletasks()  # Force the GUI to update immediately
 
 def start_scheduling():
+    global current_progress
     selectedFile = file_entry.get()
 
     log_message(f"Selected file path: '{selectedFile}'")
     if os.path.exists(selectedFile):
         try:
-            excel_file = pd.read_excel(selectedFile, sheet_name=None)
+            cached_load_data(selectedFile)  # Validates the workbook, the parsed result is cached for the scheduling run
         except Exception as e:
             log_message(f"Error reading Excel file: {e}")
+            return
     else:
         log_message(f"File not found: {selectedFile}")
 
@@ -126,10 +204,27 @@ def start_scheduling():
     
     if retrieve_calender_var.get():
         log_message("Updating staff calenders:")  
-        selectedFile = retrieve_calenders(selectedFile, output_text, startDate, endDate)
+        selectedFile = retrieve_calenders(selectedFile, output_text, startDate, endDate, force_refresh=force_refresh_var.get())
         print(selectedFile)
         
-    solutionDf, capacityUsage, goal_comparison_df, scheduleText = makeSchedule(startDate, endDate, selectedFile, output_text, check_calender=check_calender_var.get(), constant_goal_weight=slider.get(), want_ics=False) #create_ICS.get())
+    # Optional warm start from a previously saved schedule
+    hintFile = hint_entry_var.get().strip() or None
+    if hintFile and not os.path.exists(hintFile):
+        log_message(f"Previous schedule not found, starting from scratch: {hintFile}")
+        hintFile = None
+
+    # Stream every improved solution to the textbox while solving
+    current_progress = SolveProgress(log=log_message)
+    progress = current_progress
+    report = RunReport()  # Timings and solver statistics, saved next to the output workbook
+
+    if hintFile and freeze_past_var.get():
+        # Keep everything of the previous schedule before the start date, replan from the start date onward
+        solutionDf, capacityUsage, goal_comparison_df, scheduleText = replanSchedule(hintFile, startDate, endDate, selectedFile, output_text, check_calender=check_calender_var.get(), constant_goal_weight=slider.get(), want_ics=False, solver_settings=get_solver_settings(), progress=current_progress, report=report)
+    else:
+        solutionDf, capacityUsage, goal_comparison_df, scheduleText = makeSchedule(startDate, endDate, selectedFile, output_text, check_calender=check_calender_var.get(), constant_goal_weight=slider.get(), want_ics=False, solver_settings=get_solver_settings(), hint_schedule=hintFile,
+                                                                                   horizon_mode='month' if rolling_horizon_var.get() else None, progress=current_progress, report=report) #create_ICS.get())
+    current_progress = None
 
     current_time = datetime.now().strftime("%d%m%H%M")
     if check_calender_var.get(): #If availability taken into account
@@ -145,38 +240,9 @@ def start_scheduling():
         return
     
     # Save the Excel file
-    with pd.ExcelWriter(f) as writer:
-        solutionDf.to_excel(writer, sheet_name='Schedule', index=False)
-        capacityUsage.to_excel(writer, sheet_name='Capacity Usage', index=False)
-        goal_comparison_df.to_excel(writer, sheet_name='Goal Comparison', index=False)
-                   
-        #Active formulas:
-        workbook = writer.book
-        capacity_usage_worksheet = writer.sheets['Capacity Usage']
-        row_count = 2
-        for row_num in range(len(capacityUsage)):
-            capacity_usage_worksheet.write_formula(row_count-1, 2, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!F:F, B{row_count})")
-            capacity_usage_worksheet.write_formula(row_count-1, 3, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!F:F, B{row_count}, Schedule!C:C, \"Curious Case\")")
-            capacity_usage_worksheet.write_formula(row_count-1, 4, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"PAPI1\")")
-            capacity_usage_worksheet.write_formula(row_count-1, 5, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"ROLEPLAY1\")")
-            capacity_usage_worksheet.write_formula(row_count-1, 6, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"CASE1\")")
-            capacity_usage_worksheet.write_formula(row_count-1, 7, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"DATACASE\")")               
-            capacity_usage_worksheet.write_formula(row_count-1, 9, f"=I{row_count}-C{row_count}")
-            row_count += 1
-        
-        goal_comparison_worksheet = writer.sheets['Goal Comparison']
-        row_count = 2
-        for program_name in goal_comparison_df['Program']:
-            if program_name != "":
-                if program_name == 'Curious': 
-                    goal_comparison_worksheet.write_formula(row_count - 1, 3, f"=COUNTIFS(Schedule!C:C, \"Curious Case\", Schedule!G:G, 'Goal Comparison'!A{row_count})/2")
-                else:
-                    goal_comparison_worksheet.write_formula(row_count-1, 3, f"=COUNTIFS(Schedule!C:C, B{row_count}, Schedule!G:G, 'Goal Comparison'!A{row_count})/3")
-                goal_comparison_worksheet.write_formula(row_count-1, 4, f"=D{row_count}-C{row_count}")               
-                row_count+=1
-        goal_comparison_worksheet.write_formula(row_count-1, 5, f"=(SUM(D:D)/SUM(C:C))*100")              
-        goal_comparison_worksheet.write_formula(row_count - 1, 6, f"=(SUMIF(B:B, \"Curious\", D:D) / SUMIF(B:B, \"Curious\", C:C)) * 100")
-        goal_comparison_worksheet.write_formula(row_count - 1, 7, f"=(SUM(D:D) - SUMIF(B:B, \"Curious\", D:D)) / (SUM(C:C) - SUMIF(B:B, \"Curious\", C:C)) * 100")
+    saveSchedule(f, solutionDf, capacityUsage, goal_comparison_df, progress.solve_info, prepareInput(selectedFile)['assessments'])
+
+    report.write(os.path.splitext(f)[0] + ' - run report.json')
 
     # Open the saved Excel file automatically
     os.startfile(f)
@@ -226,6 +292,18 @@ file_entry.grid(row=1, column=1,sticky="ew", padx=(20, 20), pady=(0, 5))
 open_button = ctk.CTkButton(app, text="Browse", command=open_file)
 open_button.grid(row=1, column=2, pady=(0, 5))
 
+# Previous schedule to warm-start from (optional)
+hint_entry_label = ctk.CTkLabel(app, text='Previous Schedule (optional warm start):')
+hint_entry_label.grid(row=4, column=1, padx=(20,20), pady=(5,0), sticky="w")
+hint_entry_var = ctk.StringVar()
+hint_entry = ctk.CTkEntry(app, width=300, textvariable=hint_entry_var, placeholder_text="Select a saved schedule...")
+hint_entry.grid(row=5, column=1, sticky="ew", padx=(20, 20), pady=(0, 5))
+hint_button = ctk.CTkButton(app, text="Browse", command=open_hint_file)
+hint_button.grid(row=5, column=2, pady=(0, 5))
+freeze_past_var = ctk.BooleanVar(value=False)
+freeze_past_checkbox = ctk.CTkCheckBox(app, text="Keep previous schedule before start date fixed (replan)", variable=freeze_past_var)
+freeze_past_checkbox.grid(row=6, column=1, padx=(20, 20), pady=(0, 5), sticky="nw")
+
 # Start date label and calendar
 start_date_label = ctk.CTkLabel(app, text="Start Date:")
 start_date_label.grid(row=2, column=1, padx=(20, 20), pady=(5, 0), sticky="w")
@@ -258,6 +336,15 @@ check_calender_var = ctk.BooleanVar(value=True)  # Default value can be set to T
 check_calender_checkbox = ctk.CTkCheckBox(app, text="Consider Staff Availability", variable=check_calender_var)
 check_calender_checkbox.grid(row=1, column=0, padx=(20, 20), pady=(10, 0), sticky="w")
 
+# Stop button: accept the best schedule found so far
+current_progress = None
+stop_button = ctk.CTkButton(app, text="Stop & Keep Best", command=stop_scheduling)
+stop_button.grid(row=11, column=1, pady=20)
+
+# Weight sweep button: Pareto front of external assessors against candidate goals in one run
+sweep_button = ctk.CTkButton(app, text="Sweep Weights", command=start_sweep_threaded)
+sweep_button.grid(row=11, column=0, pady=20)
+
 # Start scheduling button
 start_button = ctk.CTkButton(app, text="Start Scheduling", command=start_scheduling_threaded)
 start_button.grid(row=11, column=2, pady=20)
@@ -267,6 +354,57 @@ retrieve_calender_var = ctk.BooleanVar(value=True)  # Default value can be set t
 retrieve_calender_checkbox = ctk.CTkCheckBox(app, text="Update Staff Availability (+4 min.)", variable=retrieve_calender_var)
 retrieve_calender_checkbox.grid(row=2, column=0, padx=(20, 20), pady=(10, 0), sticky="w")
 
+# Checkbox to download every calender again, instead of reusing the ones downloaded in the last 15 minutes or not modified since
+force_refresh_var = ctk.BooleanVar(value=False)
+force_refresh_checkbox = ctk.CTkCheckBox(app, text="Force Calender Refresh", variable=force_refresh_var)
+force_refresh_checkbox.grid(row=6, column=0, padx=(20, 20), pady=(10, 0), sticky="w")
+
+# Checkbox for solving month by month instead of one model for the whole range (faster for long ranges)
+rolling_horizon_var = ctk.BooleanVar(value=False)
+rolling_horizon_checkbox = ctk.CTkCheckBox(app, text="Solve Month by Month", variable=rolling_horizon_var)
+rolling_horizon_checkbox.grid(row=4, column=0, padx=(20, 20), pady=(10, 0), sticky="w")
+
+# Checkbox for the lexicographic objective: reach as many goals as possible first, then use as few externals as possible (slider is ignored)
+goals_first_var = ctk.BooleanVar(value=False)
+goals_first_checkbox = ctk.CTkCheckBox(app, text="Goals First, then Fewest Externals", variable=goals_first_var)
+goals_first_checkbox.grid(row=5, column=0, padx=(20, 20), pady=(10, 0), sticky="w")
+
+# Solver settings: preset, number of search workers, random seed and deterministic mode (reproducible benchmark runs)
+solver_frame = ctk.CTkFrame(app, fg_color="transparent")
+solver_frame.grid(row=3, column=0, padx=(20, 20), pady=(0, 5), sticky="nw")
+solver_preset_label = ctk.CTkLabel(solver_frame, text="Solver preset:")
+solver_preset_label.grid(row=0, column=0, columnspan=2, sticky="w")
+solver_preset_var = ctk.StringVar(value=DEFAULT_PRESET)
+solver_preset_menu = ctk.CTkOptionMenu(solver_frame, values=list(SOLVER_PRESETS.keys()), variable=solver_preset_var, command=preset_callback)
+solver_preset_menu.grid(row=1, column=0, columnspan=2, pady=(0, 5), sticky="w")
+workers_label = ctk.CTkLabel(solver_frame, text="Workers (0 = all cores):")
+workers_label.grid(row=2, column=0, sticky="w")
+workers_entry_var = ctk.StringVar(value=str(SOLVER_PRESETS[DEFAULT_PRESET]['workers']))
+workers_entry = ctk.CTkEntry(solver_frame, width=50, textvariable=workers_entry_var)
+workers_entry.grid(row=2, column=1, padx=(5, 0), pady=(0, 5), sticky="w")
+seed_label = ctk.CTkLabel(solver_frame, text="Random seed:")
+seed_label.grid(row=3, column=0, sticky="w")
+seed_entry_var = ctk.StringVar(value=str(SOLVER_PRESETS[DEFAULT_PRESET]['seed']))
+seed_entry = ctk.CTkEntry(solver_frame, width=50, textvariable=seed_entry_var)
+seed_entry.grid(row=3, column=1, padx=(5, 0), pady=(0, 5), sticky="w")
+deterministic_var = ctk.BooleanVar(value=SOLVER_PRESETS[DEFAULT_PRESET]['deterministic'])
+deterministic_checkbox = ctk.CTkCheckBox(solver_frame, text="Deterministic (reproducible)", variable=deterministic_var)
+deterministic_checkbox.grid(row=4, column=0, columnspan=2, pady=(5, 0), sticky="w")
+# Stopping rules: stop at a gap target or when the schedule stopped improving, or only accept proven optimal schedules
+gap_label = ctk.CTkLabel(solver_frame, text="Stop at gap (%):")
+gap_label.grid(row=5, column=0, sticky="w")
+gap_entry_var = ctk.StringVar(value="")
+gap_entry = ctk.CTkEntry(solver_frame, width=50, textvariable=gap_entry_var)
+gap_entry.grid(row=5, column=1, padx=(5, 0), pady=(5, 0), sticky="w")
+no_improvement_label = ctk.CTkLabel(solver_frame, text="Stop if no improvement (sec.):")
+no_improvement_label.grid(row=6, column=0, sticky="w")
+no_improvement_entry_var = ctk.StringVar(value="")
+no_improvement_entry = ctk.CTkEntry(solver_frame, width=50, textvariable=no_improvement_entry_var)
+no_improvement_entry.grid(row=6, column=1, padx=(5, 0), pady=(5, 0), sticky="w")
+optimal_or_bust_var = ctk.BooleanVar(value=False)
+optimal_or_bust_checkbox = ctk.CTkCheckBox(solver_frame, text="Only accept optimal schedules", variable=optimal_or_bust_var)
+optimal_or_bust_checkbox.grid(row=7, column=0, columnspan=2, pady=(5, 0), sticky="w")
+
 # Slider
 left_label = ctk.CTkLabel(app, text="Less external | Less goals")
 left_label.grid(row=8, column=0, padx=(20, 5), pady=(10, 0), sticky="e")
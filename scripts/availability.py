@@ -3,10 +3,18 @@ import pandas as pd
 import os
 import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from time import perf_counter
 from datetime import datetime, time, timedelta
+from feedCache import FEED_CACHE_TTL, cached_fetch_feed
 from ics import Calendar
 import re
-from tkinter import filedialog, END
+try:
+    from tkinter import END
+except ImportError:  # Headless servers without Tk (see batchSchedule.py)
+    END = 'end'
 import icalendar
 import recurring_ical_events
 import pytz
@@ -15,8 +23,19 @@ if getattr(sys, 'frozen', False):
     base_path = sys._MEIPASS
 else:
     base_path = os.path.dirname(os.path.abspath(__file__))
+
+CALENDER_WORKERS = 8  # Calendars downloaded at the same time
+CALENDER_TIMEOUT = (5, 60)  # Seconds to connect and to wait for data, per request
+CALENDER_RETRIES = 3  # Retries per calendar on connection errors, timeouts and 429/5xx answers, with exponential backoff
                
 def log_message(message, output_text):
+    # output_text: the GUI textbox, any callable that takes the message (progress sink of a headless run) or None to print
+    if output_text is None:  # Headless run
+        print(message)
+        return
+    if not hasattr(output_text, 'insert'):
+        output_text(message)
+        return
     output_text.configure(state='normal')  # Enable editing
     output_text.insert(END, f"{message}\n")  # Insert message at the end
     output_text.configure(state='disabled')  # Disable editing after update
@@ -54,10 +73,12 @@ def merge_overlapping_events(df):
     merged_df = pd.DataFrame(merged_events)
     return merged_df
 
-def get_calender(ics_url, staff_name, start_date_string, end_date_string):
-    response = requests.get(ics_url[staff_name])
+def get_calender(ics_url, staff_name, start_date_string, end_date_string, ical_string=None):
+    # ical_string: the ICS feed if it was already downloaded (see fetch_calenders), else it is downloaded here
+    if ical_string is None:
+        response = requests.get(ics_url[staff_name], timeout=CALENDER_TIMEOUT)
     
-    if response.status_code == 200:
+    if ical_string is not None or response.status_code == 200:
         print(f'Calendar {staff_name} successfully accessed')
         
         start_date = datetime.strptime(start_date_string, "%Y-%m-%d")
@@ -68,7 +89,8 @@ def get_calender(ics_url, staff_name, start_date_string, end_date_string):
         paris_tz = pytz.timezone('Europe/Paris')
         end_date = paris_tz.localize(end_date)
            
-        ical_string = response.text  # Get the content of the ICS file as a string
+        if ical_string is None:
+            ical_string = response.text  # Get the content of the ICS file as a string
         a_calendar = icalendar.Calendar.from_ical(ical_string)
     
         # Use recurring_ical_events to find events within the specified range
@@ -170,6 +192,57 @@ def get_calender(ics_url, staff_name, start_date_string, end_date_string):
         print(f"Error fetching calendar for {staff_name}: {response.status_code}")
         return pd.DataFrame()         
 
+def calender_session(workers=CALENDER_WORKERS, retries=CALENDER_RETRIES, backoff=0.5):
+    # One keep-alive connection pool for all calendar downloads, retrying after backoff * 2^n seconds
+    retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+# How fetch_calender got a feed (see feedCache.cached_fetch_feed)
+FEED_SOURCES = {'fresh': 'taken from the cache', 'not modified': 'not modified since the last download', 'downloaded': 'downloaded',
+                'stale': 'could not be downloaded, using the last cached copy'}
+
+def fetch_calender(session, url, timeout=CALENDER_TIMEOUT, feed_cache=True, ttl=FEED_CACHE_TTL, force_refresh=False):
+    # Download one ICS feed, through the feed cache unless feed_cache is False, returns (text, source, seconds).
+    # Raises requests.RequestException when it still fails after the retries and nothing is cached
+    start = perf_counter()
+    if feed_cache:
+        text, source = cached_fetch_feed(session, url, timeout, ttl, force_refresh)
+    else:
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        text, source = response.text, 'downloaded'
+    return text, source, perf_counter() - start
+
+def fetch_calenders(calenders, staff, output_text, workers=CALENDER_WORKERS, timeout=CALENDER_TIMEOUT, retries=CALENDER_RETRIES, feed_cache=True,
+                    ttl=FEED_CACHE_TTL, force_refresh=False):
+    # Download the ICS feeds of all staff at the same time, so the total is close to the slowest feed instead of the sum.
+    # feed_cache, ttl, force_refresh: see feedCache.py, feeds checked less than ttl seconds ago are not requested again.
+    # Returns {staff name: ICS text, or None if the download failed}. Only this thread writes to output_text
+    feeds = {}
+    sources = dict.fromkeys(list(FEED_SOURCES) + ['failed'], 0)
+    start = perf_counter()
+    with calender_session(workers, retries) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_calender, session, calenders[name], timeout, feed_cache, ttl, force_refresh): name for name in staff}
+        for number, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                feeds[name], source, seconds = future.result()
+                sources[source] += 1
+                log_message(f"  [{number}/{len(futures)}] Calender of {name} {FEED_SOURCES[source]} in {seconds:.1f} sec.", output_text)
+            except requests.RequestException as e:
+                feeds[name] = None
+                sources['failed'] += 1
+                log_message(f"  [{number}/{len(futures)}] Calender of {name} could not be downloaded: {e}", output_text)
+    log_message(f"Retrieved {len(staff) - sources['failed']} of {len(staff)} calenders in {perf_counter() - start:.1f} sec.", output_text)
+    if feed_cache:
+        log_message("Calender cache: " + ", ".join(f"{count} {source}" for source, count in sources.items()) + (" (forced refresh)" if force_refresh else ""),
+                    output_text)
+    return feeds
+
 def get_free_time(schedule_df, staff_member, start_date_string, end_date_string):
     # Ensure that 'Start Date' and 'End Date' columns are in datetime format
     schedule_df['Start Date'] = pd.to_datetime(schedule_df['Start Date'])
@@ -256,7 +329,10 @@ def find_assessment_slot(free_time_df, starttime, endtime, dayofweek):
     return final_results
 
 ##### Data
-def retrieve_calenders(template_file, output_text, start_date, end_date, links='resources/calenders.json'):
+def retrieve_calenders(template_file, output_text, start_date, end_date, links='resources/calenders.json', output_file=None, workers=CALENDER_WORKERS,
+                       feed_cache=True, ttl=FEED_CACHE_TTL, force_refresh=False):
+    # output_file: where to save the workbook with availability (default resources/assessors2025_available.xlsx)
+    # workers: calendars downloaded at the same time, feed_cache, ttl, force_refresh: reuse of earlier downloads (see fetch_calenders)
     # working_days = {
     #     "Monday": ["morning", "afternoon"],
     #     "Tuesday": ["morning", "afternoon"],
@@ -272,11 +348,14 @@ def retrieve_calenders(template_file, output_text, start_date, end_date, links='
     ### Add availability to the selected excel
     file_path = template_file
     excel_file = pd.read_excel(file_path, sheet_name=None)  # sheet_name=None loads all sheets
+    # Download all calenders first, at the same time
+    staff = [key for key in excel_file.keys() if key != 'Extra' and key != 'External' and key in calenders.keys()]
+    feeds = fetch_calenders(calenders, staff, output_text, workers=workers, feed_cache=feed_cache, ttl=ttl, force_refresh=force_refresh)
     #Loop over all calenders
     for key in excel_file.keys():   #For all assessors in assessor file
         if key != 'Extra' and key != 'External':
-            if key in calenders.keys(): #If calender link is found
-                schedule = get_calender(calenders, key, str(start_date), str(end_date))
+            if feeds.get(key) is not None: #If calender was downloaded
+                schedule = get_calender(calenders, key, str(start_date), str(end_date), ical_string=feeds[key])
                 avail_gen = get_free_time(schedule, key, str(start_date), str(end_date)) #V2
                 if avail_gen.empty == False: #pd.DataFrame([]) if a person has 0 free moments
                     avail_afternoon = find_assessment_slot(avail_gen, starttime="12:00:00", endtime="16:00:00", dayofweek=[0,1,2,3]) #Not Friday
@@ -307,8 +386,11 @@ def retrieve_calenders(template_file, output_text, start_date, end_date, links='
                 else:
                     log_message(f"{key} has 0 slots available for assessment and 0 for cases between {start_date} and {end_date}", output_text)
 
-            else: #No calender link found for this assessor
-                log_message(f"No calender found for {key}: Assume full availability", output_text) 
+            else: #No calender link found for this assessor, or the download failed
+                if key in calenders.keys():
+                    log_message(f"Calender of {key} could not be downloaded: Assume full availability", output_text)
+                else:
+                    log_message(f"No calender found for {key}: Assume full availability", output_text) 
                 all_dates = [start_date + timedelta(days=x) for x in range((end_date - start_date).days + 1)]
                 date_list = [date.strftime("%Y-%m-%d") for date in all_dates]
                 full_availability = ', '.join(date_list)
@@ -326,7 +408,8 @@ def retrieve_calenders(template_file, output_text, start_date, end_date, links='
                 excel_file[key] = df_updated
         
     # Save the updated dictionary of DataFrames back to Excel
-    output_file = os.path.join(base_path, 'resources', 'assessors2025_available.xlsx')
+    if output_file is None:
+        output_file = os.path.join(base_path, 'resources', 'assessors2025_available.xlsx')
     with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
         for sheet_name, df_sheet in excel_file.items():
             df_sheet.to_excel(writer, sheet_name=sheet_name, index=False)
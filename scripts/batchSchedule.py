@@ -0,0 +1,115 @@
+import argparse
+import glob
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+import pandas as pd
+from functionScript import makeSchedule, saveSchedule, prepareInput
+from availability import retrieve_calenders
+from solveProgress import SolveProgress
+from runReport import RunReport
+from solverSettings import SOLVER_PRESETS, DEFAULT_PRESET, resolve_solver_settings
+
+# Headless scheduling without tkinter: every job is (workbook, startDate, endDate), jobs run in a process pool and each one writes
+# '<workbook> <start> to <end>.xlsx' (the schedule), '... - log.txt' and '... - run report.json' to the output directory,
+# plus manifest.csv with the runtime and status of all jobs, e.g.:
+# python batchSchedule.py offices/ --range 2025-01-01 2025-06-30 --range 2025-07-01 2025-12-31 --output results/ --processes 4
+# python batchSchedule.py offices/ --jobs offices/jobs.csv --output results/ --preset "Fast draft"
+
+def fileSink(path):
+    # Progress sink that appends every log message to a text file (anything that takes a message works, see log_message)
+    def sink(message):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(f"{message}\n")
+    return sink
+
+def findJobs(directory, ranges=(), jobs_file=None):
+    # Every workbook in directory for every (startDate, endDate) in ranges, or the rows of a CSV with workbook, startDate, endDate columns
+    if jobs_file:
+        jobs = pd.read_csv(jobs_file)
+        return [{'workbook': os.path.join(directory, row.workbook), 'startDate': date.fromisoformat(row.startDate), 'endDate': date.fromisoformat(row.endDate)}
+                for row in jobs.itertuples(index=False)]
+    workbooks = sorted(path for path in glob.glob(os.path.join(directory, '*.xlsx')) if not os.path.basename(path).startswith('~$'))  # Skip Excel lock files
+    return [{'workbook': workbook, 'startDate': startDate, 'endDate': endDate} for workbook in workbooks for startDate, endDate in ranges]
+
+def scheduleJob(job, output_dir, check_calender=False, retrieve_calender=False, constant_goal_weight=1, solver_settings=None, horizon_mode=None,
+                model_cache=True, require_hr=False, force_refresh=False, sink=None):
+    # Schedule one job headlessly and return its manifest row. sink: progress sink for the log messages, default a log file next to the outputs
+    # force_refresh: download every calender again instead of using the feed cache (with retrieve_calender)
+    name = f"{os.path.splitext(os.path.basename(job['workbook']))[0]} {job['startDate']} to {job['endDate']}"
+    output = os.path.join(output_dir, name)
+    log = sink or fileSink(output + ' - log.txt')
+    progress = SolveProgress(log=log)
+    report = RunReport()
+    row = {'Workbook': job['workbook'], 'Start Date': job['startDate'], 'End Date': job['endDate'], 'Status': None, 'Stop Reason': None,
+           'Objective': None, 'Runtime (sec.)': None, 'Schedule': None, 'Run Report': None, 'Error': None}
+    start = time.perf_counter()
+    try:
+        assessorExcel = job['workbook']
+        if retrieve_calender:
+            assessorExcel = retrieve_calenders(assessorExcel, log, job['startDate'], job['endDate'], output_file=output + ' - availability.xlsx',
+                                               force_refresh=force_refresh)
+        solutionDf, capacityUsage, goal_comparison_df, scheduleText = makeSchedule(
+            job['startDate'], job['endDate'], assessorExcel, log, check_calender=check_calender or retrieve_calender, constant_goal_weight=constant_goal_weight,
+            solver_settings=solver_settings, horizon_mode=horizon_mode, progress=progress, model_cache=model_cache, require_hr=require_hr, report=report)
+        log(scheduleText)
+        if not solutionDf.empty or progress.solve_info:  # A rejected or missing schedule still gets its Solve Info sheet
+            row['Schedule'] = saveSchedule(output + '.xlsx', solutionDf, capacityUsage, goal_comparison_df, progress.solve_info,
+                                           prepareInput(assessorExcel)['assessments'])
+        if progress.solve_info:
+            row.update({key: progress.solve_info[-1][key] for key in ('Status', 'Stop Reason', 'Objective')})
+    except Exception as e:
+        row['Status'] = 'ERROR'
+        row['Error'] = f"{type(e).__name__}: {e}"
+        log(traceback.format_exc())
+    row['Runtime (sec.)'] = round(time.perf_counter() - start, 2)
+    row['Run Report'] = report.write(output + ' - run report.json')
+    return row
+
+def batchSchedule(jobs, output_dir, processes=None, solver_settings=None, **options):
+    # Run scheduleJob for every job in a process pool and write manifest.csv, returns the manifest in job order.
+    # options: keyword arguments of scheduleJob (check_calender, retrieve_calender, constant_goal_weight, horizon_mode, model_cache, require_hr, force_refresh)
+    os.makedirs(output_dir, exist_ok=True)
+    settings = resolve_solver_settings(solver_settings)
+    processes = processes or max(1, min(len(jobs), os.cpu_count() or 1))
+    if not settings['workers']:
+        settings['workers'] = max(1, (os.cpu_count() or 1) // processes)  # Share the cores between the concurrent jobs
+    print(f"Batch: {len(jobs)} jobs, {processes} at a time with {settings['workers']} workers each")
+
+    rows = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = {pool.submit(scheduleJob, job, output_dir, solver_settings=settings, **options): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            rows[futures[future]] = row = future.result()
+            print(f"{os.path.basename(row['Workbook'])} {row['Start Date']} to {row['End Date']}: {row['Status']} in {row['Runtime (sec.)']} sec.")
+    manifest = pd.DataFrame(rows)
+    manifest.to_csv(os.path.join(output_dir, 'manifest.csv'), index=False)
+    return manifest
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Schedule a directory of assessor workbooks in parallel, without the GUI")
+    parser.add_argument('directory')
+    parser.add_argument('--range', nargs=2, type=date.fromisoformat, action='append', default=[], metavar=('START', 'END'))
+    parser.add_argument('--jobs', help="CSV with workbook, startDate, endDate columns instead of --range")
+    parser.add_argument('--output', default='batch_output')
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--preset', default=DEFAULT_PRESET, choices=list(SOLVER_PRESETS))
+    parser.add_argument('--goal-weight', type=float, default=1)
+    parser.add_argument('--check-calender', action='store_true')
+    parser.add_argument('--retrieve-calender', action='store_true')
+    parser.add_argument('--refresh-calender', action='store_true', help="With --retrieve-calender: download every calender again, ignoring the feed cache")
+    parser.add_argument('--rolling-horizon', action='store_true')
+    parser.add_argument('--require-hr', action='store_true')
+    parser.add_argument('--no-model-cache', action='store_true')
+    args = parser.parse_args()
+
+    jobs = findJobs(args.directory, args.range, args.jobs)
+    if not jobs:
+        parser.error("No jobs: give --range START END (repeatable) or --jobs, and make sure the directory has .xlsx workbooks")
+    manifest = batchSchedule(jobs, args.output, processes=args.processes, solver_settings=args.preset, check_calender=args.check_calender,
+                             retrieve_calender=args.retrieve_calender, constant_goal_weight=args.goal_weight,
+                             horizon_mode='month' if args.rolling_horizon else None, model_cache=not args.no_model_cache, require_hr=args.require_hr,
+                             force_refresh=args.refresh_calender)
+    print(manifest.drop(columns=['Schedule', 'Run Report']).to_string(index=False))
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import pickle
+import threading
+import time
+import requests
+from modelCache import evict
+
+# Downloaded ICS feeds are cached on disk with their ETag and Last-Modified headers. A feed younger than FEED_CACHE_TTL seconds is used
+# without any request, an older one is revalidated with If-None-Match / If-Modified-Since, so an unchanged calendar costs one 304 answer.
+FEED_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".assessment_scheduler", "calendars")
+FEED_CACHE_TTL = 15 * 60
+FEED_CACHE_MAX_BYTES = 100 * 1024 * 1024
+
+def feed_cache_key(url):
+    # Hash of the URL, the (secret) calendar links never end up in file names
+    return hashlib.sha256(url.encode()).hexdigest()
+
+def load_cached_feed(url, directory=FEED_CACHE_DIR):
+    # Returns {'body', 'etag', 'last_modified', 'checked'} or None if the feed is not cached
+    path = os.path.join(directory, f"{feed_cache_key(url)}.ics")
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+def store_cached_feed(url, entry, directory=FEED_CACHE_DIR, max_bytes=FEED_CACHE_MAX_BYTES):
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{feed_cache_key(url)}.ics")
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # Feeds are downloaded by several threads at once
+        with open(temporary, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        evict(directory, max_bytes, suffix=".ics")
+    except OSError as e:
+        print(f"Could not store the calendar in the cache: {e}")
+
+def cached_fetch_feed(session, url, timeout, ttl=FEED_CACHE_TTL, force_refresh=False, directory=FEED_CACHE_DIR):
+    # Download an ICS feed through the cache, returns (text, source) with source one of
+    # 'fresh' (younger than ttl, no request), 'not modified' (304), 'downloaded' or 'stale' (the request failed, the last cached copy is used).
+    # force_refresh: always download the full feed. Raises requests.RequestException when the request fails and nothing is cached
+    entry = None if force_refresh else load_cached_feed(url, directory)
+    if entry and time.time() - entry['checked'] < ttl:
+        return entry['body'], 'fresh'
+
+    headers = {}
+    if entry and entry['etag']:
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry['last_modified']:
+        headers['If-Modified-Since'] = entry['last_modified']
+    try:
+        response = session.get(url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and entry:
+            entry['checked'] = time.time()
+            store_cached_feed(url, entry, directory)
+            return entry['body'], 'not modified'
+        response.raise_for_status()
+    except requests.RequestException:
+        stale = entry or (load_cached_feed(url, directory) if force_refresh else None)
+        if stale is None:
+            raise
+        return stale['body'], 'stale'
+
+    store_cached_feed(url, {'body': response.text, 'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'),
+                            'checked': time.time()}, directory)
+    return response.text, 'downloaded'
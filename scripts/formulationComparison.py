@@ -0,0 +1,21 @@
+import argparse
+from datetime import date
+from functionScript import compareFormulations, FORMULATIONS
+from solverSettings import SOLVER_PRESETS, DEFAULT_PRESET
+
+# Benchmark the session formulation against the original linear encoding on the same input, e.g.:
+# python formulationComparison.py resources/assessors2025.xlsx 2025-01-01 2025-12-31 --preset Benchmark
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare model size and solve performance of the model formulations")
+    parser.add_argument('assessorExcel')
+    parser.add_argument('startDate', type=date.fromisoformat)
+    parser.add_argument('endDate', type=date.fromisoformat)
+    parser.add_argument('--preset', default=DEFAULT_PRESET, choices=list(SOLVER_PRESETS))
+    parser.add_argument('--formulations', nargs='+', default=list(FORMULATIONS), choices=list(FORMULATIONS))
+    parser.add_argument('--check-calender', action='store_true')
+    parser.add_argument('--goal-weight', type=float, default=1)
+    args = parser.parse_args()
+
+    comparison = compareFormulations(args.startDate, args.endDate, args.assessorExcel, check_calender=args.check_calender,
+                                     constant_goal_weight=args.goal_weight, solver_settings=args.preset, formulations=args.formulations)
+    print(comparison.to_string(index=False))
@@ -3,18 +3,51 @@ from ortools.sat.python import cp_model
 import os
 import sys
 from functions import *
-from datetime import datetime
+from collections import defaultdict
+from variableIndex import VariableIndex
+from solverSettings import resolve_solver_settings, apply_solver_settings, solver_time_limit, stop_reason
+from solveProgress import SolveProgress
+from modelCache import model_cache_key, load_cached_model, store_cached_model
+from inputCache import cached_load_data
+from runReport import RunReport
+from datetime import datetime, timedelta
 from ics import Calendar, Event, Attendee
 import pytz
-from tkinter import filedialog, END
+try:
+    from tkinter import END
+except ImportError:  # Headless servers without Tk (see batchSchedule.py)
+    END = 'end'
 import json
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
         
 if getattr(sys, 'frozen', False):
     base_path = sys._MEIPASS
 else:
     base_path = os.path.dirname(os.path.abspath(__file__))
-    
+
+# Default goal weights of a weight sweep (same range as the slider in the GUI)
+SWEEP_WEIGHTS = (0.001, 0.25, 0.5, 1, 2, 3)
+
+# Activities and candidates per assessment of the programs that don't define them in the workbook (None: any other program)
+PROGRAM_DEFAULTS = {
+    "Curious": {"Activities": ["CURIOUS1", "CURIOUS2"], "Candidates": 1}, #No no of candidates
+    "MCP&DATA": {"Activities": ["ROLEPLAY1", "DATACASE", "PAPI1"], "Candidates": 3},
+    None: {"Activities": ["ROLEPLAY1", "CASE1", "PAPI1"], "Candidates": 3},
+}
+
+# Model encodings of buildModel, 'linear' is kept to benchmark against (see compareFormulations)
+FORMULATIONS = ('session', 'linear')
+
 def log_message(message, output_text):
+    # output_text: the GUI textbox, any callable that takes the message (progress sink of a headless run) or None to print
+    if output_text is None:  # Headless run
+        print(message)
+        return
+    if not hasattr(output_text, 'insert'):
+        output_text(message)
+        return
     output_text.configure(state='normal')  # Enable editing
     output_text.insert(END, f"{message}\n")  # Insert message at the end
     output_text.configure(state='disabled')  # Disable editing after update
@@ -102,13 +135,9 @@ def makeICS(schedule, startdate, enddate, email_file='emails.json'):
 
 
 ### Preparing the data ###
-def makeSchedule(startDate, endDate, assessorExcel, output_text, check_calender=False, constant_goal_weight=1, want_ics=False):    
-    if check_calender:
-        log_message('Using calender availability for scheduling', output_text)
-    else:
-        log_message('NOT using calender availability for scheduling', output_text)
-    
-    log_message('Start scheduling...', output_text)
+def prepareInput(assessorExcel, input_cache=True):
+    # Parse the assessor workbook (or read it from the input cache, see inputCache.py) and derive the program and role definitions used by the model
+    assessors, program_capacities, officeUnavailabilities, program_definitions = cached_load_data(assessorExcel, input_cache)
 
     # Define the time slots for each activity type
     time_slots = {
@@ -129,38 +158,16 @@ def makeSchedule(startDate, endDate, assessorExcel, output_text, check_calender=
             'Friday': "09:00 - 10:30"
         }
     }
-           
-    datesResult = workingDays(startDate, endDate)
-    dates = datesResult['workingDates']
 
-    datesTuples = datesResult['workingDatesWithWeekdays']
-    
-    weeks = datesResult['workingWeeks']
-    months = datesResult['workingMonths']
+    # Programs are the goal columns of the Extra sheet. Their activities and candidates per assessment come from the optional
+    # 'Program Activities' / 'Program Candidates' rows, otherwise from PROGRAM_DEFAULTS (a regular assessment afternoon for new programs)
+    assessments = {}
+    for program in next(iter(program_capacities.values()), {}):
+        assessments[program] = {**PROGRAM_DEFAULTS.get(program, PROGRAM_DEFAULTS[None]), **program_definitions.get(program, {})}
+        unknown = set(assessments[program]['Activities']) - set(time_slots)
+        if unknown:
+            raise ValueError(f"Unknown activities for program '{program}': {', '.join(sorted(unknown))}, choose from: {', '.join(time_slots)}")
 
-    assessors, program_capacities, officeUnavailabilities = load_data(assessorExcel)
-    
-    assessments = {
-        "Curious": {"Activities": ["CURIOUS1", "CURIOUS2"], "Candidates": 1}, #No no of candidates
-        "MCP&DATA": {"Activities": ["ROLEPLAY1", "DATACASE","PAPI1"], "Candidates": 3},
-        "AM IT": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Buildwise": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Scrum Master": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Pluxee": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        ### Future Programs (Can be added by user by simply changing Progam's monthly goal and adding "ProgramX" label to assessors)
-        "Program1": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Program2": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Program3": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Program4": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Program5": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Program6": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Program7": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-        "Program8": {"Activities": ["ROLEPLAY1", "CASE1","PAPI1"], "Candidates": 3},
-    }
-    
-    # Get focus programs for each assessor based on programs in input sheet
-    available_programs = {name: info['programs'] for name, info in assessors.items()}
-    
     #Possible roles during assessment activities:
     assessmentActivities = {
         "CURIOUS1": {"Assessors": [name for name, info in assessors.items() if "CURIOUS" in info['Activities']], "Capacity": 3},
@@ -170,473 +177,1015 @@ def makeSchedule(startDate, endDate, assessorExcel, output_text, check_calender=
         "PAPI1": {"Assessors": [name for name, info in assessors.items() if "PAPI" in info['Activities']], "Capacity": 9},
         "DATACASE": {"Assessors": [name for name, info in assessors.items() if "CASE" in info['Activities'] and info['DATA']], "Capacity": 5}
     }
-    
+
+    return {
+        'assessors': assessors,
+        'program_capacities': program_capacities,
+        'officeUnavailabilities': officeUnavailabilities,
+        'time_slots': time_slots,
+        'assessments': assessments,
+        'assessmentActivities': assessmentActivities
+    }
+
+def fixedUsage(fixed, data):
+    # Summarize assignments outside the modelled dates that are already decided (earlier windows, frozen past)
+    assessments = data['assessments']
+    usage = {
+        'capacity': defaultdict(int),        # (assessor, month) -> capacity used
+        'goal': defaultdict(int),            # (month, program) -> candidates scheduled
+        'week': defaultdict(int),            # (assessor, week) -> activities
+        'weekAssessment': defaultdict(int),  # (assessor, week) -> assessment afternoons
+        'busy': defaultdict(set),            # assessor -> dates with an activity
+        'curious': set()                     # dates with a curious case
+    }
+    for date, program, activity, assessor in fixed:
+        day = datetime.strptime(date, '%Y-%m-%d')
+        month, week = month_key(day), week_key(day)
+        usage['capacity'][(assessor, month)] += data['assessmentActivities'][activity]['Capacity']
+        if activity == assessments[program]['Activities'][0]:
+            usage['goal'][(month, program)] += assessments[program]['Candidates']
+        usage['week'][(assessor, week)] += 1
+        if program != 'Curious':
+            usage['weekAssessment'][(assessor, week)] += 1
+        usage['busy'][assessor].add(date)
+        if program == 'Curious':
+            usage['curious'].add(date)
+    return usage
+
+def buildModel(datesResult, data, output_text, check_calender=False, constant_goal_weight=1, fixed=None, formulation='session', require_hr=False,
+               diagnose=False, diagnose_availability=False, report=None):
+    # formulation: 'session' (session literal per date and program, native Boolean constraints) or 'linear' (the original linear sums)
+    # require_hr: at least one HR team member per assessment
+    # diagnose: guard every constraint family (per assessor or program and month) with an assumption literal, see diagnoseInfeasibility.
+    # Uses the linear formulation, native Boolean constraints can't be guarded. diagnose_availability also guards the availability rules
+    # report: optional RunReport that gets the time, variables and constraints of every constraint family
+    if formulation not in FORMULATIONS:
+        raise ValueError(f"Unknown formulation '{formulation}', choose from: {', '.join(FORMULATIONS)}")
+    if diagnose:
+        formulation = 'linear'
+    assessors = data['assessors']
+    program_capacities = data['program_capacities']
+    officeUnavailabilities = data['officeUnavailabilities']
+    assessments = data['assessments']
+    assessmentActivities = data['assessmentActivities']
+
+    dates = datesResult['workingDates']
+    datesTuples = datesResult['workingDatesWithWeekdays']
+    weeks = datesResult['workingWeeks']
+    months = datesResult['workingMonths']
+
+    # Boundary state of already decided assignments outside these dates
+    usage = fixedUsage(fixed or [], data)
+
+    ## Demand pre-pass: the goal left per (month, program) is also the maximum (see the goals below), so programs only get variables
+    ## in the months where they still have a goal. Programs and roles without any demand in these dates are left out of the model entirely
+    demand = {(month, program): max(0, program_goal(program_capacities, month, program) - usage['goal'][(month, program)])
+              for month in months for program in assessments}
+    assessments = {program: info for program, info in assessments.items() if any(demand[(month, program)] for month in months)}
+    activeActivities = [activity for activity in assessmentActivities if any(activity in info['Activities'] for info in assessments.values())]
+    monthList = list(months)
+    dayMonth = [monthList[group] for group in datesResult['monthGroups'].tolist()]  # (year, month) per day index
+
+    # Get focus programs for each assessor based on programs in input sheet
+    available_programs = {name: info['programs'] for name, info in assessors.items()}
+
     ### The model ###
     model = cp_model.CpModel()
+    if report is None:
+        report = RunReport()  # Not kept, the caller doesn't measure
+    report.begin_families(model)
+
+    # Assumption literals of the diagnosis: (rule, assessor or program, month) -> literal. Without diagnosis guard() adds no enforcement
+    guards = {}
+    def guard(rule, subject=None, month=None):
+        if not diagnose:
+            return []
+        if (rule, subject, month) not in guards:
+            guards[(rule, subject, month)] = model.NewBoolVar(f'guard_{rule}_{subject}_{month}')
+        return [guards[(rule, subject, month)]]
 
+    # Assessors allowed per (program, activity): role in their activities and program in their focus programs
+    eligibleAssessors = {}
+    for assessmentType, assessmentInfo in assessments.items():
+        for activity in assessmentInfo['Activities']:
+            eligibleAssessors[(assessmentType, activity)] = [assessor for assessor in assessmentActivities[activity]['Assessors']
+                                                             if assessor in available_programs and assessmentType in available_programs[assessor]]
+
+    ## Eligibility pre-pass: assignments that can never be scheduled are not created as variables at all.
+    ## Every rule is a mask over the working days (see workingDays), computed with array operations per assessor
+    weekdays, weekdayMasks, dayNumbers = datesResult['weekdays'], datesResult['weekdayMasks'], datesResult['dayNumbers']
+    officeClosed = ~np.is_busday(datesResult['days'], busdaycal=office_calendar(officeUnavailabilities))
+    curiousDay = ~weekdayMasks[2]  # Disallow Curious cases on Wednesday
+    # 0 through 4 for all weekdays
+    weeklyOff = {assessor: weekdayMasks[sorted(set(info.get('weeklyUnavailability', [])))].any(axis=0) for assessor, info in assessors.items()}
+    datesOff = {assessor: np.isin(dayNumbers, day_numbers(info.get('Unavailability', []))) for assessor, info in assessors.items()}  # Trainings for example
+    assessmentDates = {assessor: np.isin(dayNumbers, day_numbers(info.get('assessmentAvailability', []))) for assessor, info in assessors.items()}
+    caseDates = {assessor: np.isin(dayNumbers, day_numbers(info.get('caseAvailability', []))) for assessor, info in assessors.items()}
+    # Consecutive-day rule and Tuesday/Thursday curious cases against fixed assignments: the working day before and after every day
+    # (Friday and Monday are neighbours) and the other curious day of the week
+    neighbours = (dayNumbers - np.where(weekdays == 0, 3, 1), dayNumbers + np.where(weekdays == 4, 3, 1))
+    nextToFixed = {assessor: np.isin(neighbours[0], day_numbers(busyDates)) | np.isin(neighbours[1], day_numbers(busyDates))
+                   for assessor, busyDates in usage['busy'].items() if assessor != 'External'}
+    curiousClash = (weekdayMasks[1] | weekdayMasks[3]) & np.isin(dayNumbers + np.where(weekdays == 1, 2, -2), day_numbers(usage['curious']))
+    # Masks as lists, indexing a list is much faster than indexing an array one element at a time
+    officeClosed, curiousDay, curiousClash = officeClosed.tolist(), curiousDay.tolist(), curiousClash.tolist()
+    for masks in (weeklyOff, datesOff, assessmentDates, caseDates, nextToFixed):
+        for assessor in masks:
+            masks[assessor] = masks[assessor].tolist()
+    pruned = {'no goal this month': 0, 'office unavailability': 0, 'curious case on Wednesday': 0, 'weekly unavailability': 0, 'unavailability': 0,
+              'calender availability': 0, 'next to a fixed assignment': 0}
+
+    def pruneReason(d, weekday, assessmentType, activity, assessor):
+        if officeClosed[d]:  # If the office is unavailable, don't plan anything
+            return 'office unavailability'
+        if activity in ["CURIOUS1", "CURIOUS2"] and not curiousDay[d]:
+            return 'curious case on Wednesday'
+        if weeklyOff[assessor][d]:
+            # Laetitia can still do curious cases on Friday
+            if not (assessor == 'Laetitia' and weekday == 4 and assessmentType == 'Curious'):
+                return 'weekly unavailability'
+        if datesOff[assessor][d]:
+            return 'unavailability'
+        if check_calender and assessor != 'External':  # 'External' is always available
+            # Regular assessment activities need assessment availability, Curious cases need case availability
+            availableDates = caseDates[assessor] if activity in ["CURIOUS1", "CURIOUS2"] else assessmentDates[assessor]
+            if not availableDates[d]:
+                return 'calender availability'
+        if assessor in nextToFixed and nextToFixed[assessor][d]:
+            return 'next to a fixed assignment'
+        if assessmentType == 'Curious' and curiousClash[d]:
+            return 'next to a fixed assignment'
+        return None
 
     ## Create variables: All possible schedule options
-    assignments = {}
-    for date in dates:
+    index = VariableIndex(dates, months, assessments.keys(), activeActivities, assessors.keys())
+    for d, (date, weekday) in enumerate(datesTuples):
         for assessmentType, assessmentInfo in assessments.items():
+            if not demand[(dayMonth[d], assessmentType)]:
+                pruned['no goal this month'] += sum(len(eligibleAssessors[(assessmentType, activity)]) for activity in assessmentInfo['Activities'])
+                continue
             for activity in assessmentInfo['Activities']:
-                # Only consider assessors whose programs allows them to participate
-                for assessor in assessmentActivities[activity]['Assessors']:
-                    if assessor in available_programs and assessmentType in available_programs[assessor]:
-                        varName = f'{date}_{assessmentType}_{activity}_{assessor}'
-                        assignments[varName] = model.NewBoolVar(varName)
-           
+                for assessor in eligibleAssessors[(assessmentType, activity)]:
+                    reason = pruneReason(d, weekday, assessmentType, activity, assessor)
+                    if reason:
+                        pruned[reason] += 1
+                        if diagnose_availability:
+                            # Keep the assignment, but only forbid it as long as its availability rule is assumed
+                            var_id = index.add(model, date, assessmentType, activity, assessor)
+                            subject = None if reason in ('office unavailability', 'curious case on Wednesday') else assessor
+                            model.Add(index.vars[var_id] == 0).OnlyEnforceIf(guard(reason, subject, index.date_month[index.var_date[var_id]]))
+                    else:
+                        index.add(model, date, assessmentType, activity, assessor)
 
-    # No assessment on 2 consecutive weekdays for assessors (except external)
-    for date_idx, today in enumerate(datesResult['workingDates']):
-        if date_idx + 1 < len(datesResult['workingDates']):
-            tomorrow = datesResult['workingDates'][date_idx + 1]  # Get the next day
-            
-            for assessor in assessors.keys():
-                if assessor != 'External':  # Skip External assessors
-                    consecutiveday_count = 0  # Initialize the activity counter for this assessor
-                    
-                    # Loop through today's activities
-                    for assessmentType_today, assessmentInfo in assessments.items():
-                        for activity_today in assessmentInfo['Activities']:
-                            if assessor in assessmentActivities[activity_today]['Assessors']:
-                                today_label = f'{today}_{assessmentType_today}_{activity_today}_{assessor}'
-                                
-                                # If the assessor is assigned today, count the assignment
-                                if today_label in assignments:
-                                    consecutiveday_count += assignments[today_label]
-                    
-                    # Loop through tomorrow's activities
-                    for assessmentType_tomorrow, assessmentInfo in assessments.items():
-                        for activity_tomorrow in assessmentInfo['Activities']:
-                            if assessor in assessmentActivities[activity_tomorrow]['Assessors']:
-                                tomorrow_label = f'{tomorrow}_{assessmentType_tomorrow}_{activity_tomorrow}_{assessor}'
-                                
-                                # If the assessor is assigned tomorrow, count the assignment
-                                if tomorrow_label in assignments:
-                                    consecutiveday_count += assignments[tomorrow_label]
-                    
-                    # After checking both days' assignments, apply the constraint
-                    model.Add(consecutiveday_count <= 1)  # Limit total activities to 1 across both days
-
-    # Only 1 activity type per assessment, except for curious (i.e. no more than 1 PAPI, 1 (DATA)Case, 1 Roleplay and 2x CURIOUS per assignment type)
-    for date in dates:
-        for assessmentType, assessmentInfo in assessments.items():
-            for activity in assessmentInfo['Activities']:
-                if activity.startswith("CURIOUS"):  # Check if it's a Curious case
-                    # No uniqueness constraint for Curious cases because you should have CURIOUS1 and CURIOUS2 at the same time
+    log_message(f"Created {len(index)} assignment variables, pruned {sum(pruned.values())} impossible ones:", output_text)
+    for reason, count in pruned.items():
+        if count:
+            log_message(f"  - {reason}: {count}", output_text)
+
+    report.family('assignment variables', model)
+
+    variables = index.vars
+    curious_ids = {index.activity_id[activity] for activity in ["CURIOUS1", "CURIOUS2"] if activity in index.activity_id}
+    curious_program = index.program_id.get('Curious')  # None without curious case demand
+    external_id = index.assessor_id.get('External')
+    workload_assessors = [index.assessor_id[assessor] for assessor in assessors.keys() if assessor != 'External']
+
+    def atMost(literals, bound, enforce=()):
+        # 'session' formulation: native Boolean constraints for the 0/1 bounds, 'linear': the original linear sums (enforce: guard literals)
+        if formulation == 'linear' or bound > 1:
+            model.Add(sum(literals) <= bound).OnlyEnforceIf(list(enforce))
+        elif bound == 1:
+            model.AddAtMostOne(literals)
+        else:
+            model.AddBoolAnd([literal.Not() for literal in literals])
+
+    # Literals derived from the assignments, (literal, variable ids) pairs so warm starts can hint them too
+    derived = []
+
+    # Shared workload literals (session formulation): busy[(s, d)] is true when assessor s has an activity on date d,
+    # assessmentDay[(s, d)] when that activity is not a curious case. All workload rules below are expressed over these.
+    busy = {}
+    assessmentDay = {}
+    if formulation != 'linear':
+        for s in workload_assessors:
+            for d in range(len(dates)):
+                var_ids = index.by_assessor_date.get((s, d))
+                if not var_ids:
                     continue
-                else:
-                    model.Add(
-                        sum(
-                            assignments[f'{date}_{assessmentType}_{activity}_{assessor}']
-                            for assessor in assessmentActivities[activity]['Assessors']
-                            if f'{date}_{assessmentType}_{activity}_{assessor}' in assignments
-                        ) <= 1
-                    )
-
-    # Every assessor only does 1 activity per day
-    for date in dates:
-            for assessor in assessors.keys():
-                if assessor != 'External':
-                    assessorCount = 0
-                    for assessmentType, assessmentInfo in assessments.items():
-                        for activity in assessmentInfo['Activities']:
-                            if assessor in assessmentActivities[activity]['Assessors']:
-                                key = f'{date}_{assessmentType}_{activity}_{assessor}'
-                                if key in assignments:
-                                    assessorCount += assignments[f'{date}_{assessmentType}_{activity}_{assessor}']
-                    model.Add(assessorCount <= 1) 
-
-    # Assessment afternoons: All activities of an assesment type (except curious case) should be scheduled together
-    for assessmentType, assessmentInfo in assessments.items():
-        assessmentLength = len(assessmentInfo['Activities'])
-        for date in dates:
-            activityVars = []
-            for activity in assessmentInfo['Activities']:
-                for assessor in assessmentActivities[activity]['Assessors']:
-                    key = f'{date}_{assessmentType}_{activity}_{assessor}'
-                    if key in assignments:
-                        activityVars.append(assignments[f'{date}_{assessmentType}_{activity}_{assessor}'])
+                # Exactly one of (the assignments of the day, not busy): busy equals the sum, so also at most 1 activity per day
+                busy[(s, d)] = model.NewBoolVar(f'busy_{index.assessors[s]}_{dates[d]}')
+                model.AddExactlyOne(index.select(var_ids) + [busy[(s, d)].Not()])
+                derived.append((busy[(s, d)], var_ids))
 
+                assessment_ids = [i for i in var_ids if index.var_activity[i] not in curious_ids]
+                if len(assessment_ids) == len(var_ids):
+                    assessmentDay[(s, d)] = busy[(s, d)]
+                elif assessment_ids:
+                    assessmentDay[(s, d)] = model.NewBoolVar(f'assessment_day_{index.assessors[s]}_{dates[d]}')
+                    model.AddExactlyOne(index.select(assessment_ids) + [assessmentDay[(s, d)].Not()])
+                    derived.append((assessmentDay[(s, d)], assessment_ids))
+
+    report.family('busy literals', model)
+
+    # No assessment on 2 consecutive weekdays for assessors (except external)
+    for d in range(len(dates) - 1):
+        for s in workload_assessors:
+            if formulation != 'linear':
+                if (s, d) in busy and (s, d + 1) in busy:
+                    model.AddAtMostOne([busy[(s, d)], busy[(s, d + 1)]])
+                continue
+            twoDays = index.by_assessor_date.get((s, d), []) + index.by_assessor_date.get((s, d + 1), [])
+            if twoDays:
+                model.Add(sum(index.select(twoDays)) <= 1).OnlyEnforceIf(guard('consecutive days', index.assessors[s], index.date_month[d]))  # Limit total activities to 1 across both days
+
+    report.family('consecutive days', model)
+
+    # Every assessor only does 1 activity per day (part of the busy literals in the session formulation)
+    if formulation == 'linear':
+        for s in workload_assessors:
+            for d in range(len(dates)):
+                var_ids = index.by_assessor_date.get((s, d))
+                if var_ids:
+                    model.Add(sum(index.select(var_ids)) <= 1).OnlyEnforceIf(guard('one activity per day', index.assessors[s], index.date_month[d]))
+
+    report.family('one activity per day', model)
+
+    # Assessment afternoons: All activities of an assesment type should be scheduled together, one session literal per (date, program)
+    sessions = {}
+    for (d, p), var_ids in index.by_date_program.items():
+        assessmentType = index.programs[p]
+        session = model.NewBoolVar(f'session_{dates[d]}_{assessmentType}')
+        sessions[(d, p)] = session
+        derived.append((session, var_ids))
+
+        if formulation == 'linear':
             # Constraint to ensure all activities are scheduled together or none are scheduled
-            all_or_none = model.NewBoolVar(f'all_or_none_{date}_{assessmentType}')
-            model.Add(sum(activityVars) == assessmentLength).OnlyEnforceIf(all_or_none)
-            model.Add(sum(activityVars) == 0).OnlyEnforceIf(all_or_none.Not())
-
-
-    # Capacity constraint: Assessors have a personal monthly capacity that shouldn't be exceeded
-    for assessor, assessorInfo in assessors.items():
-        for month, monthDates in months.items():
-            model.Add(
-            sum(
-                assignments[f'{date}_{assessmentType}_{activity}_{assessor}'] * assessmentActivities[activity]['Capacity']
-                for date in monthDates
-                for assessmentType, assessmentInfo in assessments.items()
-                for activity in assessmentInfo['Activities']
-                if assessor in assessmentActivities[activity]['Assessors']
-                and f'{date}_{assessmentType}_{activity}_{assessor}' in assignments
-            ) <= assessorInfo["Capacity"][month]
-        )
-
-    # Don't schedule assessors if they have weekly non-working days (format: 0 through 4 for all weekdays, seperated by comma's)
-    for assessor, assessorInfo in assessors.items():
-        if "weeklyUnavailability" in assessorInfo:
-            for unavailableDay in assessorInfo['weeklyUnavailability']:
-                for date, weekday in datesTuples:
-                    if weekday == unavailableDay:
-                        for assessmentType, assessmentInfo in assessments.items():
-                            for activity in assessmentInfo['Activities']:
-                                if assessor in assessmentActivities[activity]['Assessors']:
-                                    key = f'{date}_{assessmentType}_{activity}_{assessor}'
-                                    if key in assignments:
-                                        # Check if the assessor is 'Laetitia', the day is Friday, and the assessment is not a curious case
-                                        if assessor != 'Laetitia':
-                                            # Apply the unavailability constraint only for assessment afternoons
-                                            model.Add(assignments[f'{date}_{assessmentType}_{activity}_{assessor}'] == 0)
-                                        elif assessor == 'Laetitia':
-                                            if weekday != 4:
-                                                model.Add(assignments[f'{date}_{assessmentType}_{activity}_{assessor}'] == 0)
-                                            else:
-                                                if assessmentType != 'Curious':
-                                                    model.Add(assignments[f'{date}_{assessmentType}_{activity}_{assessor}'] == 0)
-
-    # If they have anything in the unavailability column (trainings for example), don't schedule them (overlap with new calender function!)
-    for assessor, assessorInfo in assessors.items():
-        if "Unavailability" in assessorInfo:
-            for unavailableDate in assessorInfo['Unavailability']:
-                for assessmentType, assessmentInfo in assessments.items():
-                    for activity in assessmentInfo['Activities']:
-                        if assessor in assessmentActivities[activity]['Assessors']:
-                            model.Add(assignments[varName] == 0)
-
-    # If the office is unavailable, don't plan anything 
-    for unavailableDate in officeUnavailabilities:
-        for assessmentType, assessmentInfo in assessments.items():
-            for activity in assessmentInfo['Activities']:
-                for assessor in assessmentActivities[activity]['Assessors']:
-                    varName = f'{unavailableDate}_{assessmentType}_{activity}_{assessor}'
-                    if varName in assignments:  # Check if the variable exists
-                        model.Add(assignments[varName] == 0)
-   
-    if check_calender:
-        for assessor, assessor_info in assessors.items():
-            if assessor == 'External':
-                continue  # Skip to next assessor, since 'External' is always available
-            
-            assessment_dates = set(assessor_info.get('assessmentAvailability', []))  # Use set for faster lookups
-            case_dates = set(assessor_info.get('caseAvailability', []))  # Use set for faster lookups
-            
-            for date in dates:  # Go over all dates
-                # Apply hard constraints based on availability
-                for assessment_type, assessment_info in assessments.items():
-                    for activity in assessment_info['Activities']:
-                        key = f'{date}_{assessment_type}_{activity}_{assessor}'
-                        if key in assignments:
-                            # If it's a regular assessment activity (not Curious), check for assessment availability
-                            if activity not in ["CURIOUS1", "CURIOUS2"]:
-                                # Only schedule if date is in assessment availability
-                                if date not in assessment_dates:
-                                    model.Add(assignments[key] == 0)  # Not available for assessment
-                            else:
-                                # Handle Curious cases (assumed to be case-specific availability)
-                                if date not in case_dates:
-                                    model.Add(assignments[key] == 0)  # Not available for Curious case
-
-            # # Print results for the assessor
-            # print(f"Assessor: {assessor}")
-            # print(f"Assessment Available Dates: {assessment_dates}")
-            # print(f"Case Available Dates: {case_dates}")
-            
+            assessmentLength = len(assessments[assessmentType]['Activities'])
+            activityVars = index.select(var_ids)
+            together = guard('assessment afternoon together', assessmentType, index.date_month[d])
+            model.Add(sum(activityVars) == assessmentLength).OnlyEnforceIf([session] + together)
+            model.Add(sum(activityVars) == 0).OnlyEnforceIf([session.Not()] + together)
+            continue
+
+        # Every role (PAPI, (DATA)Case, Roleplay, CURIOUS1/2) of a planned session gets exactly one assessor, no role without a session
+        for activity in assessments[assessmentType]['Activities']:
+            roleVars = index.select(index.by_date_program_activity.get((d, p, index.activity_id[activity]), []))
+            if not roleVars:  # Nobody can take this role on this date
+                model.AddBoolAnd([session.Not()])
+                continue
+            model.AddAtMostOne(roleVars)
+            model.AddBoolOr(roleVars).OnlyEnforceIf(session)
+            for var in roleVars:
+                model.AddImplication(var, session)
+
+    report.family('assessment afternoons', model)
+
+    if formulation == 'linear':
+        # Only 1 activity type per assessment, except for curious (i.e. no more than 1 PAPI, 1 (DATA)Case, 1 Roleplay and 2x CURIOUS per assignment type)
+        for (d, p, a), var_ids in index.by_date_program_activity.items():
+            # No uniqueness constraint for Curious cases because you should have CURIOUS1 and CURIOUS2 at the same time
+            if a not in curious_ids:
+                model.Add(sum(index.select(var_ids)) <= 1).OnlyEnforceIf(guard('one assessor per role', index.programs[p], index.date_month[d]))
+
+    report.family('one assessor per role', model)
+
+    # Capacity constraint: Assessors have a personal monthly capacity that shouldn't be exceeded (minus what fixed assignments already use)
+    activityCapacity = [assessmentActivities[activity]['Capacity'] for activity in index.activities]
+    for (s, month), var_ids in index.by_assessor_month.items():
+        assessor = index.assessors[s]
+        remaining = max(0, assessor_capacity(assessors[assessor], month) - usage['capacity'][(assessor, month)])
+        model.Add(
+            sum(variables[i] * activityCapacity[index.var_activity[i]] for i in var_ids) <= remaining
+        ).OnlyEnforceIf(guard('monthly capacity', assessor, month))
+
+    report.family('monthly capacity', model)
+
     # Make sure curious case are on monday, friday and mutually exclusive tuesday/thursday
     tuesday_cases = {}
     thursday_cases = {}
     # Loop through the dates and weekdays
     for date, weekday in datesTuples:
-        if date in officeUnavailabilities:
+        if date in officeClosed or curious_program is None:
             continue  # Skip office unavailability days
-    
+
+        d = index.date_id[date]
+        if formulation != 'linear':
+            # One assessor per curious role is already part of the session constraints, the session literal tracks the day
+            if (d, curious_program) in sessions:
+                if weekday == 1:  # Tuesday
+                    tuesday_cases[date] = [sessions[(d, curious_program)]]
+                elif weekday == 3:  # Thursday
+                    thursday_cases[date] = [sessions[(d, curious_program)]]
+            continue
         for activity in ["CURIOUS1", "CURIOUS2"]:
+            curiousVars = index.select(index.by_date_program_activity.get((d, curious_program, index.activity_id[activity]), []))
             # Allow Curious cases but don't require them on Monday, Tuesday, Thursday, and Friday
             if weekday == 0 or weekday == 1 or weekday == 3 or weekday == 4:  # Monday, Tuesday, Thursday, Friday
-                model.Add(sum(assignments[f'{date}_Curious_{activity}_{assessor}'] for assessor in assessmentActivities[activity]['Assessors']) <= 1)
-                
+                model.Add(sum(curiousVars) <= 1).OnlyEnforceIf(guard('one curious case per day', None, index.date_month[d]))
+
                 # Track Tuesday and Thursday Curious case assignments
                 if weekday == 1:  # Tuesday
-                    tuesday_cases[date] = sum(assignments[f'{date}_Curious_{activity}_{assessor}'] for assessor in assessmentActivities[activity]['Assessors'])
+                    tuesday_cases[date] = curiousVars
                 elif weekday == 3:  # Thursday
-                    thursday_cases[date] = sum(assignments[f'{date}_Curious_{activity}_{assessor}'] for assessor in assessmentActivities[activity]['Assessors'])
-    
-            # Disallow Curious cases on Wednesday
-            elif weekday == 2:  # Wednesday
-                model.Add(sum(assignments[f'{date}_Curious_{activity}_{assessor}'] for assessor in assessmentActivities[activity]['Assessors']) == 0)
-    
+                    thursday_cases[date] = curiousVars
+
     # Mutual exclusion for Tuesday and Thursday
     for tuesday_date, tuesday_assignment in tuesday_cases.items():
         # Find the Thursday of the same week
-        tuesday_date = pd.to_datetime(tuesday_date, format='%Y-%m-%d')  # or the appropriate format of your dates
-        thursday_date = tuesday_date + pd.DateOffset(days=2)        
+        thursday_date = (datetime.strptime(tuesday_date, '%Y-%m-%d') + timedelta(days=2)).strftime('%Y-%m-%d')
         # If the corresponding Thursday exists, add the mutual exclusion constraint
         if thursday_date in thursday_cases:
-            model.Add(tuesday_assignment + thursday_cases[thursday_date] <= 1)
+            atMost(tuesday_assignment + thursday_cases[thursday_date], 1, guard('curious on Tuesday or Thursday', None, index.date_month[index.date_id[tuesday_date]]))
+
+    report.family('curious case days', model)
 
     # Maximum 2 activities per week for each assessor, 2 cases | 1 case & 1 assessment day | NOT 2 assessment days (too intense)
     for weekNum, weekDates in weeks.items():
-        for assessor in assessors.keys():
-            if assessor != 'External':
-                weeklyActivityCount = 0
-                assessmentDayCount = 0  # Counter for assessment days
-                for date in weekDates:
-                    for assessmentType, assessmentInfo in assessments.items():
-                        for activity in assessmentInfo['Activities']:
-                            if assessor in assessmentActivities[activity]['Assessors']:
-                                key = f'{date}_{assessmentType}_{activity}_{assessor}'
-                                if key in assignments:
-                                    weeklyActivityCount += assignments[f'{date}_{assessmentType}_{activity}_{assessor}']
-                                    # Check if the activity is an assessment day activity
-                                    if activity not in ['CURIOUS1', 'CURIOUS2']:
-                                        assessmentDayCount += assignments[key]
-                model.Add(weeklyActivityCount <= 2)
-                model.Add(assessmentDayCount <= 1)  # Restrict to only 1 assessment day per week
-            
-    #Ensure at least one HR team member per assessment
-    ## with the current capacity it's not possible to find a solution with this constraint active...
-    if False:  
-        for date in weekDates:
-            for  assessmentType, assessmentInfo in assessments.items():
-                key = f'{date}_{assessmentType}_{activity}_{assessor}'
-                if key in assignments:
-                    model.Add( sum(assignments[f'{date}_{assessmentType}_{activity}_{assessor}']
-                                for activity in assessmentInfo['Activities']
-                                for assessor in assessmentActivities[activity]['Assessors'] if assessors[assessor]['HR']) >=1 )
-   
-    external_assessor_count = sum(
-    assignments[f'{date}_{assessmentType}_{activity}_External']
-    for date in dates
-    for assessmentType, assessmentInfo in assessments.items()
-    for activity in assessmentInfo['Activities']
-    if 'External' in assessmentActivities[activity]['Assessors']
-    and f'{date}_{assessmentType}_{activity}_External' in assignments  # Ensure key exists
-)
-    
+        week_ids = [index.date_id[date] for date in weekDates]
+        for s in workload_assessors:
+            assessor = index.assessors[s]
+            if formulation != 'linear':
+                weekBusy = [busy[(s, d)] for d in week_ids if (s, d) in busy]
+                if weekBusy:
+                    atMost(weekBusy, max(0, 2 - usage['week'][(assessor, weekNum)]))
+                weekAssessmentDays = [assessmentDay[(s, d)] for d in week_ids if (s, d) in assessmentDay]
+                if weekAssessmentDays:
+                    atMost(weekAssessmentDays, max(0, 1 - usage['weekAssessment'][(assessor, weekNum)]))
+                continue
+            weekVars = [i for d in week_ids for i in index.by_assessor_date.get((s, d), [])]
+            if weekVars:
+                weekMonth = index.date_month[week_ids[0]]
+                model.Add(sum(index.select(weekVars)) <= max(0, 2 - usage['week'][(assessor, weekNum)])).OnlyEnforceIf(guard('max 2 activities per week', assessor, weekMonth))
+                # Restrict to only 1 assessment day per week
+                model.Add(sum(variables[i] for i in weekVars if index.var_activity[i] not in curious_ids) <= max(0, 1 - usage['weekAssessment'][(assessor, weekNum)])
+                          ).OnlyEnforceIf(guard('one assessment day per week', assessor, weekMonth))
+
+    report.family('weekly limits', model)
+
+    #Ensure at least one HR team member per planned assessment (only when the session takes place)
+    if require_hr:
+        for (d, p), var_ids in index.by_date_program.items():
+            hrGuard = guard('HR member per assessment', index.programs[p], index.date_month[d])
+            hrVars = [variables[i] for i in var_ids if assessors[index.assessors[index.var_assessor[i]]]['HR']]
+            if hrVars:
+                model.Add(sum(hrVars) >= 1).OnlyEnforceIf([sessions[(d, p)]] + hrGuard)
+            else:  # No HR member can take any role of this session, so it can't take place
+                model.AddBoolAnd([sessions[(d, p)].Not()]).OnlyEnforceIf(hrGuard)
+
+    report.family('HR member per assessment', model)
+
+    externalVars = [variables[i] for i in range(len(index)) if index.var_assessor[i] == external_id]
+    external_assessor_count = sum(externalVars)
+
     # Count how many sessions have not been planned (underscheduled)
     goal_deviations = []
     for month, monthDates in months.items():
-        month_name = get_month_name(month)  # Convert month number to name
-        for program in assessments.keys():
-            program_goal = program_capacities[month_name][program]  # Get the program goal for the month
-        
-            total_candidates_for_program = 0
-            for date in monthDates:
-                for assessmentType, assessmentInfo in assessments.items():
-                    if program in assessmentType:
-                        activity = assessmentInfo['Activities'][0]  # Assuming first activity for scheduling
-                        for assessor in assessmentActivities[activity]['Assessors']:
-                            key = f'{date}_{assessmentType}_{activity}_{assessor}'
-                            if key in assignments:
-                                total_candidates_for_program += assignments[key] * assessments[assessmentType]['Candidates']
-            
+        month_ids = [index.date_id[date] for date in monthDates]
+        for program, assessmentInfo in assessments.items():
+            # Get the program goal for the month, minus the candidates fixed assignments already cover
+            monthGoal = demand[(month, program)]
+            if not monthGoal:
+                continue  # No variables in this month (demand pre-pass), nothing to count
+
+            p, a = index.program_id[program], index.activity_id[assessmentInfo['Activities'][0]]
+            if formulation == 'linear':
+                # Count the first activity of each session (Assuming first activity for scheduling)
+                total_candidates_for_program = sum(
+                    variables[i] * assessmentInfo['Candidates']
+                    for d in month_ids
+                    for i in index.by_date_program_activity.get((d, p, a), [])
+                )
+            else:
+                total_candidates_for_program = sum(sessions[(d, p)] * assessmentInfo['Candidates'] for d in month_ids if (d, p) in sessions)
+
             # Ensure the total number of scheduled candidates doesn't exceed the program goal
-            under_goal = model.NewIntVar(0, program_goal, f'under_goal_{month}_{program}')
-            
+            under_goal = model.NewIntVar(0, monthGoal, f'under_goal_{month}_{program}')
+
             # Allow under-scheduling but prevent over-scheduling
-            model.Add(total_candidates_for_program <= program_goal)
-            model.Add(program_goal - total_candidates_for_program <= under_goal)  # Only under-achievement allowed
-            
+            model.Add(total_candidates_for_program <= monthGoal).OnlyEnforceIf(guard('no more than the goal', program, month))
+            model.Add(monthGoal - total_candidates_for_program <= under_goal)  # Only under-achievement allowed
+
             # Add the under_goal to the deviations for minimization
             goal_deviations.append(under_goal)
 
     # Update the objective function to minimize both external assessor usage and goal deviations
     model.Minimize(external_assessor_count + constant_goal_weight * sum(goal_deviations))
+    report.family('goals and objective', model)
+
+    # The objective terms are kept so the objective can be rebuilt with another weight (weight sweep)
+    return {'model': model, 'index': index, 'sessions': sessions, 'busy': busy, 'assessmentDay': assessmentDay, 'derived': derived, 'pruned': pruned,
+            'external': externalVars, 'goal_deviations': goal_deviations, 'guards': guards}
+
+def cachedBuildModel(datesResult, data, output_text, check_calender=False, constant_goal_weight=1, fixed=None, formulation='session', model_cache=True,
+                     require_hr=False, report=None):
+    # buildModel, but a model built before for the same input, dates and options is loaded from the model cache instead
+    report = report if report is not None else RunReport()
+    if not model_cache:
+        with report.phase('build model'):
+            return buildModel(datesResult, data, output_text, check_calender, constant_goal_weight, fixed, formulation, require_hr, report=report)
+    key = model_cache_key(data, datesResult, check_calender, formulation, fixed, require_hr)
+    with report.phase('load cached model'):
+        built = load_cached_model(key, constant_goal_weight)
+    if built is not None:
+        log_message(f"Loaded model from cache ({len(built['index'])} assignment variables)", output_text)
+        report.add_families(built['families'], cached=True)
+        return built
+    buildReport = RunReport()  # Families of this build only, stored with the model so a cache hit still reports them
+    with report.phase('build model'):
+        built = buildModel(datesResult, data, output_text, check_calender, constant_goal_weight, fixed, formulation, require_hr, report=buildReport)
+    built['families'] = buildReport.families
+    report.add_families(buildReport.families)
+    try:
+        with report.phase('store cached model'):
+            store_cached_model(key, built)
+    except OSError as e:
+        print(f"Could not store the model in the cache: {e}")
+    return built
+
+### The Solution ###
+def solveModel(built, settings, days_difference, output_text, hint_schedule=None, progress=None, report=None):
+    # progress: optional SolveProgress callback that streams improved solutions and can stop the search early
+    # report: optional RunReport that gets the solve time and the CP-SAT statistics
+    if settings['objective'] == 'lexicographic':
+        return solveLexicographic(built, settings, days_difference, output_text, hint_schedule, progress, report)
+    measured = report is not None
+    report = report if measured else RunReport()
+    model, index = built['model'], built['index']
+
+    # Warm start: seed the search with the assignments of a previous schedule
+    if hint_schedule is not None:
+        hintedAssignments = load_schedule_assignments(hint_schedule)
+        matched = index.add_hints(model, hintedAssignments, built['derived'])
+        log_message(f"Warm start: {matched} of {len(hintedAssignments)} previous assignments used as solution hints", output_text)
 
-    ### The Solution ###
     solver = cp_model.CpSolver()
-    
-    #NEW: 
+
+    # Workers, seed, deterministic mode and time limit (depending on date range) from the chosen preset
+    time_limit = apply_solver_settings(solver, settings, days_difference)
+    if hint_schedule is not None:
+        solver.parameters.repair_hint = True  # Inputs changed since the previous schedule, so the hint may no longer be feasible
+    limit_kind = "deterministic time" if settings['deterministic'] else "time"
+    print(f"Difference between start and end: {days_difference} days - Time limit: {time_limit} sec.")
+    log_message(f"Solver preset '{settings['preset']}': {settings['workers'] or 'all'} workers, seed {settings['seed']}, {limit_kind} limit {time_limit:g} sec.", output_text)
+    if progress is None and settings['no_improvement_time']:
+        progress = SolveProgress(log=lambda message: log_message(message, output_text))  # The no-improvement rule needs a solution callback
+    if measured:
+        # Keep the search log in the response, the run report reads the presolve statistics from it
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = settings.get('log_search_progress', False)
+        solver.parameters.log_to_response = True
+    with report.phase('solve'):
+        if progress is None:
+            status = solver.Solve(model)
+        else:
+            progress.attach(solver, index, settings['no_improvement_time'])
+            status = solver.Solve(model, progress)
+            progress.detach()
+
+    # Record why the solve stopped
+    reason = stop_reason(solver, status, settings, progress)
+    if settings['optimal_or_bust'] and status == cp_model.FEASIBLE:
+        reason = f"not proven optimal ({reason}), schedule rejected"
+        status = cp_model.UNKNOWN
+    info = {
+        'Status': solver.StatusName(status),
+        'Stop Reason': reason,
+        'Objective': solver.ObjectiveValue() if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) else None,
+        'Best Bound': solver.BestObjectiveBound(),
+        'Wall Time (sec.)': round(solver.WallTime(), 2),
+        'Deterministic Time': round(solver.ResponseProto().deterministic_time, 2),
+        'Time Limit (sec.)': round(time_limit, 2),
+        'Preset': settings['preset'],
+        'Phase': settings.get('phase', settings['objective'])
+    }
+    log_message(f"Solve stopped: {reason} ({info['Status']}, {info['Wall Time (sec.)']} sec.)", output_text)
+    if progress is not None:
+        progress.record(info)
+    report.solve(solver, status, info['Phase'])
+    return solver, status
+
+def solveLexicographic(built, settings, days_difference, output_text, hint_schedule=None, progress=None, report=None):
+    # Goals first: minimize the goal shortfall, then minimize external use without giving up any of that shortfall.
+    # Every phase gets its share of the time limit (phase_split) and its own line in the solve info. Changes the objective of built['model'].
+    model = built['model']
+    shortfall = sum(built['goal_deviations'])
+    time_limit = solver_time_limit(settings, days_difference)
+    log_message("Lexicographic solve: goal shortfall first, then external assessors", output_text)
+
+    model.Minimize(shortfall)
+    phase1 = dict(settings, objective='weighted', phase='1: goal shortfall', time_limit=time_limit * settings['phase_split'])
+    solver, status = solveModel(built, phase1, days_difference, output_text, hint_schedule, progress, report)
+    if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+        return solver, status
+    best = round(solver.ObjectiveValue())
+    solution = list(solver.ResponseProto().solution)
+    log_message(f"Phase 1: goal shortfall of {best} candidates" + ("" if status == cp_model.OPTIMAL else " (not proven minimal)"), output_text)
+
+    # Keep the shortfall of phase 1 as a constraint and minimize external use
+    model.Add(shortfall <= best)
+    model.Minimize(sum(built['external']))
+    model.ClearHints()
+    if settings['phase_hint']:
+        # The phase 1 schedule satisfies the new constraint, so it is a complete and feasible hint
+        model.Proto().solution_hint.vars.extend(range(len(solution)))
+        model.Proto().solution_hint.values.extend(solution)
+    phase2 = dict(settings, objective='weighted', phase='2: external use', time_limit=time_limit * (1 - settings['phase_split']))
+    solver, status = solveModel(built, phase2, days_difference, output_text, progress=progress, report=report)
+    if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+        log_message(f"Phase 2: {round(solver.ObjectiveValue())} external assignments at a goal shortfall of {best} candidates", output_text)
+    return solver, status
+
+def diagnoseInfeasibility(datesResult, data, output_text, check_calender=False, fixed=None, require_hr=False, availability=True, time_limit=30):
+    # Explain an infeasible model: every constraint family (per assessor or program and month), and with availability also every availability
+    # rule, is guarded by an assumption literal. Returns the conflicting rules as a DataFrame (see diagnoseModel)
+    built = buildModel(datesResult, data, output_text, check_calender, fixed=fixed, require_hr=require_hr, diagnose=True, diagnose_availability=availability)
+    return diagnoseModel(built, output_text, time_limit)
+
+def diagnoseModel(built, output_text, time_limit=30):
+    # The solver's sufficient assumptions of a model built with diagnose=True are the rules that can't hold together,
+    # shrunk by dropping every rule the conflict doesn't need
+    start = time.perf_counter()
+    model, guards = built['model'], built['guards']
+    model.ClearObjective()  # Only feasibility matters
+
+    def infeasibleCore(rules, limit):
+        model.ClearAssumptions()
+        model.AddAssumptions([guards[rule] for rule in rules])
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = max(1, limit)
+        if solver.Solve(model) != cp_model.INFEASIBLE:
+            return None
+        core = set(solver.SufficientAssumptionsForInfeasibility())
+        return [rule for rule in rules if guards[rule].Index() in core]
+
+    conflict = infeasibleCore(list(guards), time_limit)
+    if conflict is None:
+        log_message("Diagnosis: no conflicting rules found within the time limit", output_text)
+        return pd.DataFrame(columns=['Rule', 'Assessor / Program', 'Month'])
+
+    # Shrink the conflict: a rule that can be left out while the rest stays infeasible is not part of it
+    i = 0
+    while i < len(conflict) and time.perf_counter() - start < time_limit:
+        smaller = infeasibleCore(conflict[:i] + conflict[i + 1:], min(5, time_limit - (time.perf_counter() - start)))
+        if smaller is None:
+            i += 1  # Needed for the conflict
+        else:
+            conflict = smaller
+
+    diagnosis = pd.DataFrame([{'Rule': rule, 'Assessor / Program': subject or '', 'Month': month_label(month) if month else ''}
+                              for rule, subject, month in conflict], columns=['Rule', 'Assessor / Program', 'Month'])
+    log_message(f"Diagnosis ({time.perf_counter() - start:.1f} sec.): these rules can't all hold together:", output_text)
+    for _, row in diagnosis.iterrows():
+        log_message(f"  - {row['Rule']}" + (f" for {row['Assessor / Program']}" if row['Assessor / Program'] else "") + (f" in {row['Month']}" if row['Month'] else ""), output_text)
+    return diagnosis
+
+def solvedAssignments(built, solver):
+    # (date, program, activity, assessor) of every assignment set to 1, in variable order
+    index = built['index']
+    return list(index.frame(index.assigned_ids(solver.ResponseProto())).itertuples(index=False, name=None))
+
+def scheduleObjective(assigned, datesResult, data, constant_goal_weight=1):
+    # Objective of the model evaluated on a list of assignments (to compare schedules built in different ways)
+    assessments = data['assessments']
+    achieved = defaultdict(int)
+    for date, program, activity, assessor in assigned:
+        if activity == assessments[program]['Activities'][0]:
+            achieved[(month_key(datetime.strptime(date, '%Y-%m-%d')), program)] += assessments[program]['Candidates']
+    external = sum(1 for assignment in assigned if assignment[3] == 'External')
+    shortfall = sum(max(0, program_goal(data['program_capacities'], month, program) - achieved[(month, program)])
+                    for month in datesResult['workingMonths'] for program in assessments)
+    return external + constant_goal_weight * shortfall
+
+def compileSchedule(assigned, startDate, endDate, datesResult, data, output_text, want_ics=False):
+    assessors = data['assessors']
+    program_capacities = data['program_capacities']
+    assessments = data['assessments']
+    assessmentActivities = data['assessmentActivities']
+    time_slots = data['time_slots']
+    months = datesResult['workingMonths']
+
+    log_message('Scheduling finished, compiling file...', output_text)
+    # One row per assignment, all columns are derived at once instead of row by row
+    solutionDf = pd.DataFrame(list(assigned), columns=['Date', 'Program', 'Role', 'Assessor'])
+
+    # Keep the order of the model: date, program, activity, assessor
+    order = {'Program': {program: i for i, program in enumerate(assessments)},
+             'Role': {activity: i for i, activity in enumerate(assessmentActivities)},
+             'Assessor': {assessor: i for i, assessor in enumerate(assessors)}}
+    solutionDf = solutionDf.sort_values(['Date', 'Program', 'Role', 'Assessor'], key=lambda column: column.map(order[column.name]) if column.name in order else column,
+                                        kind='stable', ignore_index=True)
+
+    # Determine the time slot based on the activity and weekday (for cases and Curious, times depend on the day)
+    weekdays = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    slotTable = pd.DataFrame([(activity, weekday, slots.get(weekday, "Unknown Time") if isinstance(slots, dict) else slots)
+                              for activity, slots in time_slots.items() for weekday in weekdays], columns=['Role', 'Weekday', 'Time Slot'])
+    dates = pd.to_datetime(solutionDf['Date'], format='%Y-%m-%d')
+    solutionDf['Weekday'] = dates.dt.day_name()
+    solutionDf = solutionDf.merge(slotTable, on=['Role', 'Weekday'], how='left')
+    solutionDf['Time Slot'] = solutionDf['Time Slot'].fillna("Unknown Time")
+    solutionDf['Month'] = dates.dt.month
+    solutionDf['Year'] = dates.dt.year  # Months of a horizon over several years are told apart by the year
+    solutionDf['Total Capacity Cost'] = solutionDf['Role'].map({activity: info['Capacity'] for activity, info in assessmentActivities.items()})
+
+    # Schedule text: every working date with the sessions planned on it
+    isCurious = solutionDf['Program'] == 'Curious'
+    candidates = solutionDf['Program'].map({program: str(info['Candidates']) for program, info in assessments.items()})
+    lines = ("Assessment afternoon scheduled for " + candidates + " candidates with " + solutionDf['Assessor'] + " assigned to "
+             + solutionDf['Role'] + " at " + solutionDf['Time Slot'] + "\n")
+    lines[isCurious] = "Curious case scheduled with " + solutionDf['Assessor'][isCurious] + " at " + solutionDf['Time Slot'][isCurious] + "\n"
+    linesPerDate = lines.groupby(solutionDf['Date']).agg(''.join).to_dict() if len(solutionDf) else {}
+    scheduleText = "".join(f"Date: {date}\n" + linesPerDate.get(date, "") for date in datesResult['workingDates'])
+
+    solutionDf['Program'] = solutionDf['Program'].replace('Curious', 'Curious Case')
+    solutionDf = solutionDf[['Date', 'Time Slot', 'Program', 'Role', 'Total Capacity Cost', 'Assessor', 'Month', 'Year']]  # Rearrange order
+
+    # Capacity usage per month and assessor, split per activity type. Assessors who weren't scheduled are included with 0 so it's easy to check their absence
+    capacityColumns = {'Curious Case': 'Curious Case', 'PAPI1': 'PAPI', 'ROLEPLAY1': 'Roleplay', 'CASE1': 'Business Case', 'DATACASE': 'Datacase'}
+    category = solutionDf['Role'].map(capacityColumns).where(solutionDf['Program'] != 'Curious Case', 'Curious Case')
+    perCategory = solutionDf.assign(Category=category).pivot_table(index=['Year', 'Month', 'Assessor'], columns='Category', values='Total Capacity Cost',
+                                                                    aggfunc='sum', fill_value=0)
+    grid = pd.MultiIndex.from_tuples([(year, month, assessor) for year, month in months for assessor in assessors], names=['Year', 'Month', 'Assessor'])
+    capacityUsage = perCategory.reindex(index=grid, columns=list(dict.fromkeys(capacityColumns.values())), fill_value=0)
+    capacityUsage.insert(0, 'Total Capacity Cost', capacityUsage.sum(axis=1))
+    capacityUsage = capacityUsage.reset_index()
+    capacityTable = pd.DataFrame([(year, month, assessor, assessor_capacity(info, (year, month))) for year, month in months for assessor, info in assessors.items()],
+                                 columns=['Year', 'Month', 'Assessor', 'Total Capacity'])
+    capacityUsage = capacityUsage.merge(capacityTable, on=['Year', 'Month', 'Assessor'], how='left')
+    capacityUsage['Remaining Capacity'] = capacityUsage['Total Capacity'] - capacityUsage['Total Capacity Cost']
+    # Sort by 'Month' ascending and then by 'Total Capacity Cost' descending, Year goes last so the formulas of saveSchedule keep their columns
+    capacityUsage = capacityUsage.sort_values(by=['Year', 'Month', 'Total Capacity Cost'], ascending=[True, True, False], kind='stable', ignore_index=True)
+    capacityUsage = capacityUsage[[column for column in capacityUsage.columns if column != 'Year'] + ['Year']]
+
+    # Goal comparison: initial goal against the sessions scheduled per month and program (a Curious case counts once for CURIOUS1 and CURIOUS2)
+    sessionsPerMonth = solutionDf.drop_duplicates(['Date', 'Program'])['Program'].replace('Curious Case', 'Curious').groupby([solutionDf['Year'], solutionDf['Month']]).value_counts()
+    goalTable = pd.DataFrame([(year, month, program, program_goal(program_capacities, (year, month), program), info.get('Candidates', 1))
+                              for year, month in months for program, info in assessments.items()],
+                             columns=['Year', 'Month', 'Program', 'Goal', 'Candidates'])
+    goal_comparison_df = goalTable[['Month', 'Program', 'Year']].copy()
+    goal_comparison_df['Initial Goal'] = goalTable['Goal'] / goalTable['Candidates']
+    goal_comparison_df['Final Scheduled'] = [sessionsPerMonth.get((year, month, program), 0) for year, month, program in zip(goalTable['Year'], goalTable['Month'], goalTable['Program'])]
+    goal_comparison_df['Final Scheduled'] = goal_comparison_df['Final Scheduled'].astype(float)
+    goal_comparison_df['Difference'] = goal_comparison_df['Final Scheduled'] - goal_comparison_df['Initial Goal']
+
+    # Credits per session: Curious = 6, assessment afternoon = 19 (5 + 5 + 9)
+    credits = goal_comparison_df['Program'].eq('Curious').map({True: 6, False: 19})
+    initialCredits = goal_comparison_df['Initial Goal'] * credits
+    finalCredits = goal_comparison_df['Final Scheduled'] * credits
+    curious = goal_comparison_df['Program'] == 'Curious'
+
+    def percentage(final, initial):
+        return (final.sum() / initial.sum()) * 100 if initial.sum() > 0 else 0
+
+    credits_success_percentage_curious = percentage(finalCredits[curious], initialCredits[curious])
+    credits_success_percentage_non_curious = percentage(finalCredits[~curious], initialCredits[~curious])
+    credits_success_percentage = percentage(finalCredits, initialCredits)
+
+    # If indicated to create ICS files, check success and call makeICS
+    if credits_success_percentage >= 90 and want_ics:
+        # Check if solutionDf is empty before calling makeICS
+        if not solutionDf.empty:
+            makeICS(solutionDf, startDate, endDate)
+        else:
+            print("The solution DataFrame is empty. No ICS files will be created.")
+
+    # Create a summary row with the totals and both percentages
+    summary_row = pd.DataFrame([{
+        'Month': '',  # Empty for the summary row
+        'Program': '',  # Empty for the summary row
+        'Initial Goal': '',
+        'Final Scheduled': '',
+        'Difference': '',
+        '% Assessment Planned': round(credits_success_percentage, 2),
+        '% Curious': round(credits_success_percentage_curious, 2),
+        '% Assessment Afternoons': round(credits_success_percentage_non_curious, 2),
+        'Year': ''
+    }])
+
+    # Delete any programs where for that month the goal was 0 and append the summary row
+    goal_comparison_df = pd.concat([goal_comparison_df[goal_comparison_df['Initial Goal'] > 0], summary_row], ignore_index=True)
+    goal_comparison_df = goal_comparison_df[['Month', 'Program', 'Initial Goal', 'Final Scheduled', 'Difference', '% Assessment Planned', '% Curious', '% Assessment Afternoons',
+                                             'Year']]
+
+    return solutionDf, capacityUsage, goal_comparison_df, scheduleText
+
+def rollingHorizon(startDate, endDate, data, output_text, check_calender=False, constant_goal_weight=1, settings=None, overlap_months=0, progress=None, model_cache=True,
+                   report=None, hint_schedule=None, require_hr=False):
+    # Solve month by month, optionally looking ahead overlap_months, and only commit the first month of every window.
+    # Committed assignments are passed to the next window as fixed assignments, carrying over the consecutive-day rule,
+    # weekly limits across a month change and remaining monthly capacity.
+    # hint_schedule: previous schedule, every window is warm-started with its assignments in the window's dates.
+    # Returns the committed assignments, the worst window status (FEASIBLE as soon as one window was not proven optimal)
+    # and, for a window without solution, its dates and fixed assignments to diagnose it with (else None)
+    settings = resolve_solver_settings(settings)
+    monthStarts = pd.date_range(pd.Timestamp(startDate).to_period('M').to_timestamp(), endDate, freq='MS')
+    # Share the fixed part of the time budget (or an explicit time limit) over the windows so the total stays close to the monolithic solve
+    windowSettings = dict(settings, base_time=settings['base_time'] / len(monthStarts))
+    if settings.get('time_limit'):
+        windowSettings['time_limit'] = settings['time_limit'] / len(monthStarts)
+    hints = load_schedule_assignments(hint_schedule) if hint_schedule is not None else None
+    committed = []
+    worst = cp_model.OPTIMAL
+    for i, monthStart in enumerate(monthStarts):
+        windowStart = max(startDate, monthStart.date())
+        commitEnd = min(endDate, (monthStart + pd.offsets.MonthEnd(1)).date())
+        windowEnd = min(endDate, (monthStart + pd.offsets.MonthEnd(1 + overlap_months)).date())
+
+        log_message(f"Window {i + 1}/{len(monthStarts)}: {windowStart} to {windowEnd}", output_text)
+        windowDates = workingDays(windowStart, windowEnd)
+        built = cachedBuildModel(windowDates, data, output_text, check_calender, constant_goal_weight, fixed=committed, model_cache=model_cache,
+                                 require_hr=require_hr, report=report)
+        windowHints = None
+        if hints is not None:
+            windowHints = {hint for hint in hints if str(windowStart) <= hint[0] <= str(windowEnd)} or None
+        solver, status = solveModel(built, windowSettings, (windowEnd - windowStart).days, output_text, windowHints, progress=progress, report=report)
+        if status != cp_model.OPTIMAL and status != cp_model.FEASIBLE:
+            log_message(f"No solution found for {windowStart} to {windowEnd}", output_text)
+            return None, status, (windowDates, committed)
+        if status == cp_model.FEASIBLE:
+            worst = cp_model.FEASIBLE
+
+        log_message(f"  {solver.StatusName(status)}, objective {solver.ObjectiveValue():g} in {solver.WallTime():.1f} sec.", output_text)
+        commitUntil = commitEnd.strftime('%Y-%m-%d')
+        committed += [assignment for assignment in solvedAssignments(built, solver) if assignment[0] <= commitUntil]
+
+    return committed, worst, None
+
+def compareHorizonModes(startDate, endDate, assessorExcel, output_text=None, check_calender=False, constant_goal_weight=1, solver_settings=None, overlap_months=(0, 1)):
+    # Runtime and objective of the monolithic solve against month-by-month solves (with each look-ahead in overlap_months)
+    settings = resolve_solver_settings(solver_settings)
+    datesResult = workingDays(startDate, endDate)
+    data = prepareInput(assessorExcel)
+
+    results = []
+    runs = [('monolithic', None)] + [(f'month, {overlap} month overlap', overlap) for overlap in overlap_months]
+    for mode, overlap in runs:
+        log_message(f"Comparison run: {mode}", output_text)
+        start = time.perf_counter()
+        if overlap is None:
+            built = buildModel(datesResult, data, output_text, check_calender, constant_goal_weight)
+            solver, status = solveModel(built, settings, (endDate - startDate).days, output_text)
+            assigned = solvedAssignments(built, solver) if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE else None
+            statusName = solver.StatusName(status)
+        else:
+            assigned, status, _ = rollingHorizon(startDate, endDate, data, output_text, check_calender, constant_goal_weight, settings, overlap)
+            statusName = cp_model.CpSolver().StatusName(status)
+        results.append({
+            'Mode': mode,
+            'Status': statusName,
+            'Runtime (sec.)': round(time.perf_counter() - start, 2),
+            'Objective': scheduleObjective(assigned, datesResult, data, constant_goal_weight) if assigned is not None else None,
+            'External Assignments': sum(1 for assignment in assigned if assignment[3] == 'External') if assigned is not None else None
+        })
+    return pd.DataFrame(results)
+
+def compareFormulations(startDate, endDate, assessorExcel, output_text=None, check_calender=False, constant_goal_weight=1, solver_settings=None, formulations=FORMULATIONS):
+    # Model size, build time and solve results of the same date range with every model formulation
+    settings = resolve_solver_settings(solver_settings)
+    datesResult = workingDays(startDate, endDate)
+    data = prepareInput(assessorExcel)
+
+    results = []
+    for formulation in formulations:
+        log_message(f"Comparison run: {formulation} formulation", output_text)
+        start = time.perf_counter()
+        built = buildModel(datesResult, data, output_text, check_calender, constant_goal_weight, formulation=formulation)
+        buildTime = time.perf_counter() - start
+        proto = built['model'].Proto()
+        solver, status = solveModel(built, settings, (endDate - startDate).days, output_text)
+        found = status == cp_model.OPTIMAL or status == cp_model.FEASIBLE
+        results.append({
+            'Formulation': formulation,
+            'Variables': len(proto.variables),
+            'Constraints': len(proto.constraints),
+            'Build Time (sec.)': round(buildTime, 2),
+            'Status': solver.StatusName(status),
+            'Solve Time (sec.)': round(solver.WallTime(), 2),
+            'Deterministic Time': round(solver.ResponseProto().deterministic_time, 2),
+            'Objective': solver.ObjectiveValue() if found else None,
+            'Best Bound': solver.BestObjectiveBound(),
+            'Conflicts': solver.NumConflicts(),
+            'Branches': solver.NumBranches()
+        })
+    return pd.DataFrame(results)
+
+# Model skeleton shared by the weight sweep workers (set once per worker by _initSweepWorker)
+_sweepSkeleton = {}
+
+def _initSweepWorker(skeleton):
+    _sweepSkeleton.update(skeleton)
+
+def _sweepSolve(weight, settings, days_difference):
+    # Solve the shared model skeleton with the objective for one goal weight, returns the ids of the assigned variables
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(_sweepSkeleton['proto'])
+    model.ClearObjective()
+    external = [model.GetBoolVarFromProtoIndex(i) for i in _sweepSkeleton['external']]
+    deviations = [model.GetIntVarFromProtoIndex(i) for i in _sweepSkeleton['goal_deviations']]
+    model.Minimize(sum(external) + weight * sum(deviations))
+
+    solver = cp_model.CpSolver()
+    apply_solver_settings(solver, settings, days_difference)
+    progress = SolveProgress(log=lambda message: None)  # Only for the no-improvement rule of the preset
+    progress.attach(solver, None, settings['no_improvement_time'])
+    status = solver.Solve(model, progress)
+    progress.detach()
+    found = status == cp_model.OPTIMAL or (status == cp_model.FEASIBLE and not settings['optimal_or_bust'])
+    assigned_ids = np.flatnonzero(np.asarray(solver.ResponseProto().solution)[_sweepSkeleton['var_index']]) if found else None
+    return {'Weight': weight, 'Status': solver.StatusName(status), 'Solve Time (sec.)': round(solver.WallTime(), 2), 'assigned_ids': assigned_ids}
+
+def weightSweep(startDate, endDate, assessorExcel, output_text=None, check_calender=False, weights=SWEEP_WEIGHTS, solver_settings=None, processes=None, use_threads=False):
+    # Solve several goal weights concurrently and return the Pareto front of external days against goal fulfilment,
+    # plus the compiled schedule (solutionDf, capacityUsage, goal_comparison_df, scheduleText) of every weight on the front.
+    # The input is parsed and the model is built once, the workers only swap the objective.
+    # use_threads: threads instead of processes (CP-SAT releases the GIL while solving), for callers that can't be re-imported by a child process
+    settings = resolve_solver_settings(solver_settings)
+    if settings['objective'] != 'weighted':
+        log_message(f"Weight sweep: the '{settings['objective']}' objective is ignored, every weight is solved with the weighted objective", output_text)
+    datesResult = workingDays(startDate, endDate)
+    data = prepareInput(assessorExcel)
+    built = buildModel(datesResult, data, output_text, check_calender)
+    index = built['index']
+    skeleton = {
+        'proto': built['model'].Proto().SerializeToString(),
+        'external': [var.Index() for var in built['external']],
+        'goal_deviations': [var.Index() for var in built['goal_deviations']],
+        'var_index': np.asarray(index.var_index, dtype=np.int64)
+    }
+
+    processes = processes or min(len(weights), os.cpu_count() or 1)
+    if not settings['workers']:
+        settings['workers'] = max(1, (os.cpu_count() or 1) // processes)  # Share the cores between the concurrent solves
     days_difference = (endDate - startDate).days
-    print(f"Difference between start and end: {days_difference} days - Time limit: {120 + 2*days_difference} sec.")
-    solver.parameters.max_time_in_seconds = 120 + 2*days_difference  # Set the maximum time limit depending on date range
-    
-    solver.parameters.log_search_progress = False
-    status = solver.Solve(model)
+    log_message(f"Weight sweep: {len(weights)} weights, {processes} at a time with {settings['workers']} workers each", output_text)
+
+    executor = ThreadPoolExecutor if use_threads else ProcessPoolExecutor
+    with executor(max_workers=processes, initializer=_initSweepWorker, initargs=(skeleton,)) as pool:
+        results = list(pool.map(_sweepSolve, weights, [settings] * len(weights), [days_difference] * len(weights)))
+
+    rows = []
+    schedules = {}
+    for result in results:
+        log_message(f"Weight {result['Weight']:g}: {result['Status']} in {result['Solve Time (sec.)']} sec.", output_text)
+        if result['assigned_ids'] is None:
+            continue
+        assigned = list(index.frame(result['assigned_ids']).itertuples(index=False, name=None))
+        schedules[result['Weight']] = compileSchedule(assigned, startDate, endDate, datesResult, data, output_text)
+        summary = schedules[result['Weight']][2].iloc[-1]
+        rows.append({
+            'Weight': result['Weight'],
+            'Status': result['Status'],
+            'Solve Time (sec.)': result['Solve Time (sec.)'],
+            'External Days': len({assignment[0] for assignment in assigned if assignment[3] == 'External'}),
+            'External Assignments': sum(1 for assignment in assigned if assignment[3] == 'External'),
+            '% Assessment Planned': summary['% Assessment Planned'],
+            '% Curious': summary['% Curious'],
+            '% Assessment Afternoons': summary['% Assessment Afternoons']
+        })
+    sweep = pd.DataFrame(rows, columns=['Weight', 'Status', 'Solve Time (sec.)', 'External Days', 'External Assignments',
+                                        '% Assessment Planned', '% Curious', '% Assessment Afternoons'])
+
+    # Keep the non-dominated schedules: no other schedule has fewer (or equal) external days and a higher (or equal) fulfilment, one of them strictly
+    dominated = [any((other['External Days'] <= row['External Days'] and other['% Assessment Planned'] >= row['% Assessment Planned'])
+                     and (other['External Days'] < row['External Days'] or other['% Assessment Planned'] > row['% Assessment Planned'])
+                     for _, other in sweep.iterrows())
+                 for _, row in sweep.iterrows()]
+    front = sweep[~np.array(dominated, dtype=bool)].drop_duplicates(['External Days', '% Assessment Planned'])
+    front = front.sort_values('External Days', ignore_index=True)
+    return front, {weight: schedules[weight] for weight in front['Weight']}
+
+def replanSchedule(previous_schedule, freezeDate, endDate, assessorExcel, output_text, startDate=None, check_calender=False, constant_goal_weight=1,
+                   want_ics=False, solver_settings=None, progress=None, model_cache=True, require_hr=False, report=None):
+    # Replan from freezeDate onward while keeping every assignment of previous_schedule (workbook or solutionDf) before freezeDate.
+    # Frozen assignments are constants: they use up capacity, goals and weekly limits, but only freezeDate to endDate is modelled.
+    # report: optional RunReport with the timings and solver statistics of this run
+    settings = resolve_solver_settings(solver_settings)
+    report = report if report is not None else RunReport()
+    report.set(mode='replan', startDate=startDate, freezeDate=freezeDate, endDate=endDate, input=assessorExcel, check_calender=check_calender,
+               constant_goal_weight=constant_goal_weight, solver_settings=settings)
+    previous = load_schedule_assignments(previous_schedule)
+    freezeFrom = freezeDate.strftime('%Y-%m-%d')
+    if startDate is None:  # Report the whole previous schedule
+        startDate = min([datetime.strptime(assignment[0], '%Y-%m-%d').date() for assignment in previous] + [freezeDate])
+    startFrom = startDate.strftime('%Y-%m-%d')
+
+    frozen = [assignment for assignment in previous if startFrom <= assignment[0] < freezeFrom]
+    log_message(f"Replanning {freezeDate} to {endDate}, keeping {len(frozen)} assignments before {freezeDate} fixed", output_text)
+
+    with report.phase('load_data'):
+        data = prepareInput(assessorExcel)
+    with report.phase('workingDays'):
+        datesResult = workingDays(freezeDate, endDate)
+    built = cachedBuildModel(datesResult, data, output_text, check_calender, constant_goal_weight, fixed=frozen, model_cache=model_cache,
+                             require_hr=require_hr, report=report)
+    # The not-frozen part of the previous schedule is a good starting point for the new one
+    replanned = {assignment for assignment in previous if assignment[0] >= freezeFrom}
+    solver, status = solveModel(built, settings, (endDate - freezeDate).days, output_text, hint_schedule=replanned, progress=progress, report=report)
 
-    solutionDf = pd.DataFrame(columns=['Date', 'Program', 'Role', 'Total Capacity Cost', 'Assessor', 'Time Slot'])
-    
-    
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-        log_message('Scheduling finished, compiling file...', output_text)
-        scheduleText = ""
-        for date in dates:
-            scheduleText += f"Date: {date}\n"
-            weekday = pd.to_datetime(date, format='%Y-%m-%d').strftime('%A')  # Get the weekday name
-    
-            for assessmentType, assessmentInfo in assessments.items():
-                for activity in assessmentInfo['Activities']:
-                    for assessor in assessmentActivities[activity]['Assessors']:
-                        if f'{date}_{assessmentType}_{activity}_{assessor}' in assignments:
-                            if solver.Value(assignments[f'{date}_{assessmentType}_{activity}_{assessor}']):
-                                # Determine the time slot based on the activity and weekday
-                                if isinstance(time_slots[activity], dict):  # For cases and Curious, times depend on the day
-                                    time_slot = time_slots[activity].get(weekday, "Unknown Time")
-                                else:
-                                    time_slot = time_slots[activity]  # For general assessments
+        with report.phase('extraction'):
+            assigned = frozen + solvedAssignments(built, solver)
+        with report.phase('compile schedule'):
+            return compileSchedule(assigned, startDate, endDate, workingDays(startDate, endDate), data, output_text, want_ics)
+
+    scheduleText = "No solution found. \n"
+    if status == cp_model.INFEASIBLE:
+        with report.phase('diagnosis'):
+            diagnosis = diagnoseInfeasibility(datesResult, data, output_text, check_calender, fixed=frozen, require_hr=require_hr)
+        scheduleText += "".join(f"Conflicting rule: {' '.join(str(value) for value in row if value)}\n" for row in diagnosis.itertuples(index=False))
+    return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), scheduleText
+
+def saveSchedule(f, solutionDf, capacityUsage, goal_comparison_df, solve_info=(), assessments=None):
+    # Save a schedule workbook with active formulas in the Capacity Usage and Goal Comparison sheets (GUI and batch runs)
+    # assessments: program definitions of the input (prepareInput), the Goal Comparison formulas count the roles of a program
+    # and divide by its number of roles. Without them the roles are counted in the schedule
+    # Every sheet has its Month in column A (Schedule: G) and its Year in the last column, so the formulas match on both
+    with pd.ExcelWriter(f) as writer:
+        solutionDf.to_excel(writer, sheet_name='Schedule', index=False)
+        capacityUsage.to_excel(writer, sheet_name='Capacity Usage', index=False)
+        goal_comparison_df.to_excel(writer, sheet_name='Goal Comparison', index=False)
+        pd.DataFrame(solve_info).to_excel(writer, sheet_name='Solve Info', index=False)  # Why (every window of) the solve stopped
+        if solutionDf.empty:  # No (accepted) schedule: only the Solve Info sheet has content, no formulas to write
+            return f
+               
+        #Active formulas:
+        capacity_usage_worksheet = writer.sheets['Capacity Usage']
+        row_count = 2
+        for row_num in range(len(capacityUsage)):
+            capacity_usage_worksheet.write_formula(row_count-1, 2, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!H:H, K{row_count}, Schedule!F:F, B{row_count})")
+            capacity_usage_worksheet.write_formula(row_count-1, 3, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!H:H, K{row_count}, Schedule!F:F, B{row_count}, Schedule!C:C, \"Curious Case\")")
+            capacity_usage_worksheet.write_formula(row_count-1, 4, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!H:H, K{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"PAPI1\")")
+            capacity_usage_worksheet.write_formula(row_count-1, 5, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!H:H, K{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"ROLEPLAY1\")")
+            capacity_usage_worksheet.write_formula(row_count-1, 6, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!H:H, K{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"CASE1\")")
+            capacity_usage_worksheet.write_formula(row_count-1, 7, f"=SUMIFS(Schedule!E:E, Schedule!G:G, A{row_count}, Schedule!H:H, K{row_count}, Schedule!F:F, B{row_count}, Schedule!D:D, \"DATACASE\")")               
+            capacity_usage_worksheet.write_formula(row_count-1, 9, f"=I{row_count}-C{row_count}")
+            row_count += 1
     
-                                if assessmentType == 'Curious':
-                                    scheduleText += f"Curious case scheduled with {assessor} at {time_slot}\n"
-                                    program = 'Curious Case'
-                                else:
-                                    scheduleText += f"Assessment afternoon scheduled for {assessmentInfo['Candidates']} candidates with {assessor} assigned to {activity} at {time_slot}\n"
-                                    for prog in ['MCP&DATA', 'AM IT', 'Buildwise', 'Scrum Master', 'Pluxee', 'Program1', 'Program2', 'Program3', 'Program4', 'Program5', 'Program6', 'Program7', 'Program8']:
-                                        if prog in assessmentType:
-                                            program = prog
-                                            break
-                                            
-                                # Append to the DataFrame, including the time slot
-                                capacityCost = assessmentActivities[activity]['Capacity']
-                                new_row = pd.DataFrame([{
-                                    'Date': date, 
-                                    'Month': pd.to_datetime(date, format='%Y-%m-%d').month,
-                                    'Program': program,
-                                    'Role': activity, 
-                                    'Total Capacity Cost': capacityCost, 
-                                    'Assessor': assessor,
-                                    'Time Slot': time_slot
-                                }])
-                                solutionDf = pd.concat([solutionDf, new_row], ignore_index=True)
-
-
-        solutionDf['Date'] = pd.to_datetime(solutionDf['Date'], format='%Y-%m-%d')
-        solutionDf['Month'] = solutionDf['Date'].dt.month
-        capacityUsage = solutionDf.groupby(['Month', 'Assessor'])['Total Capacity Cost'].sum().reset_index()
-        capacityUsage['Total Capacity'] = capacityUsage.apply(lambda row: assessors[row['Assessor']]['Capacity'][row['Month']], axis=1)
-        # Insert two empty columns before 'Total Capacity'
-        capacityUsage.insert(capacityUsage.columns.get_loc('Total Capacity'), 'Curious Case', '')
-        capacityUsage.insert(capacityUsage.columns.get_loc('Total Capacity'), 'PAPI', '')
-        capacityUsage.insert(capacityUsage.columns.get_loc('Total Capacity'), 'Roleplay', '')
-        capacityUsage.insert(capacityUsage.columns.get_loc('Total Capacity'), 'Business Case', '')
-        capacityUsage.insert(capacityUsage.columns.get_loc('Total Capacity'), 'Datacase', '')
-        capacityUsage['Remaining Capacity'] = capacityUsage['Total Capacity'] - capacityUsage['Total Capacity Cost']
-        #V2: Also add the ones who weren't scheduled
-        for month in solutionDf['Month'].unique():
-            filtered_df = solutionDf[solutionDf['Month'] == month]
-            assessors_this_month = filtered_df['Assessor'].unique()
-            for assessor in assessors.keys():
-                if assessor not in assessors_this_month:
-                    print(assessors[assessor]['Capacity'][month])
-                    new_row_df = pd.DataFrame([{'Month': month, 'Assessor': assessor, 'Curious Case': 0, 'PAPI': 0, 'Roleplay': 0, 'Business Case': 0, 'Datacase': 0, 'Total Capacity Cost': 0, 'Total Capacity': assessors[assessor]['Capacity'][month], 'Remaining Capacity': assessors[assessor]['Capacity'][month]}])
-                    capacityUsage = pd.concat([capacityUsage, new_row_df], ignore_index=True)
-                    
-        # Sort the DataFrame first by 'Month', then by 'Total Capacity Cost'
-        # Sort by 'Month' ascending and then by 'Total Capacity Cost' descending
-        capacityUsage = capacityUsage.sort_values(by=['Month', 'Total Capacity Cost'], ascending=[True, False])
+        if assessments is not None:
+            roles = {program: len(info['Activities']) for program, info in assessments.items()}
+        else:
+            roles = solutionDf['Role'].groupby(solutionDf['Program'].replace('Curious Case', 'Curious')).nunique().to_dict()
+        goal_comparison_worksheet = writer.sheets['Goal Comparison']
+        row_count = 2
+        for program_name in goal_comparison_df['Program']:
+            if program_name != "":
+                scheduled = "\"Curious Case\"" if program_name == 'Curious' else f"B{row_count}"  # Curious sessions are 'Curious Case' in the schedule
+                goal_comparison_worksheet.write_formula(row_count - 1, 3, f"=COUNTIFS(Schedule!C:C, {scheduled}, Schedule!G:G, 'Goal Comparison'!A{row_count}, Schedule!H:H, 'Goal Comparison'!I{row_count})/{roles.get(program_name, 1)}")
+                goal_comparison_worksheet.write_formula(row_count-1, 4, f"=D{row_count}-C{row_count}")               
+                row_count+=1
+        goal_comparison_worksheet.write_formula(row_count-1, 5, "=(SUM(D:D)/SUM(C:C))*100")              
+        goal_comparison_worksheet.write_formula(row_count - 1, 6, "=(SUMIF(B:B, \"Curious\", D:D) / SUMIF(B:B, \"Curious\", C:C)) * 100")
+        goal_comparison_worksheet.write_formula(row_count - 1, 7, "=(SUM(D:D) - SUMIF(B:B, \"Curious\", D:D)) / (SUM(C:C) - SUMIF(B:B, \"Curious\", C:C)) * 100")
+    return f
 
-        
-        solutionDf['Date'] = solutionDf['Date'].dt.strftime('%Y-%m-%d') #Make sure not to include time
-        solutionDf = solutionDf[['Date', 'Time Slot', 'Program', 'Role', 'Total Capacity Cost', 'Assessor', 'Month']] #Rearrange order
+def makeSchedule(startDate, endDate, assessorExcel, output_text, check_calender=False, constant_goal_weight=1, want_ics=False, solver_settings=None, hint_schedule=None,
+                 horizon_mode=None, overlap_months=0, progress=None, model_cache=True, require_hr=False, report=None):
+    # solver_settings: preset name from SOLVER_PRESETS or a dict of overrides (workers, seed, deterministic, time_limit, preset)
+    # hint_schedule: previously saved schedule workbook or solutionDf to warm-start the solver from
+    # horizon_mode: None for one model over the whole range, 'month' to solve month by month (rolling horizon, overlap_months of look-ahead)
+    # progress: optional SolveProgress that streams intermediate solutions and lets the caller accept the incumbent early
+    # model_cache: reuse the model of an earlier run with the same input, dates and calender option (see modelCache.py)
+    # require_hr: at least one HR team member per assessment. If no schedule is possible, the conflicting rules are diagnosed
+    # report: optional RunReport that records phase timings, constraint family sizes and solver statistics (write it with report.write)
+    settings = resolve_solver_settings(solver_settings)
+    report = report if report is not None else RunReport()
+    report.set(mode=horizon_mode or 'monolithic', startDate=startDate, endDate=endDate, input=assessorExcel, check_calender=check_calender,
+               constant_goal_weight=constant_goal_weight, solver_settings=settings)
 
-        ##NEW
-        #Initialize a new DataFrame for goal comparison
-        goal_comparison_df = pd.DataFrame(columns=['Month', 'Program', 'Initial Goal', 'Final Scheduled'])
-        
-        # Iterate through each month and program to compare initial goals with the final result
-        for month, monthDates in months.items():
-            month_name = get_month_name(month)  # Convert month number to name
-            for program in assessments.keys():
-                program_goal = program_capacities[month_name][program]  # Get the program goal for the month
-            
-                # Initialize a variable to count scheduled candidates for this program
-                total_candidates_for_program = 0
-                for date in monthDates:
-                    if program == 'Curious':  # Special case handling for Curious program
-                        curious_assigned = False  # Track if a Curious case is counted already
-                        for assessor in assessmentActivities['CURIOUS1']['Assessors']:
-                            key1 = f'{date}_Curious_CURIOUS1_{assessor}'
-                            key2 = f'{date}_Curious_CURIOUS2_{assessor}'
-                            
-                            if key1 in assignments and key2 in assignments and not curious_assigned:
-                                # If both CURIOUS1 and CURIOUS2 are assigned, count it as one case
-                                if solver.Value(assignments[key1]) or solver.Value(assignments[key2]):
-                                    total_candidates_for_program += 1  # Count the curious case as one
-                                    curious_assigned = True
-                    else:
-                        for assessmentType, assessmentInfo in assessments.items():
-                            if program in assessmentType:  # Match program to the correct assessment type
-                                activity = assessmentInfo['Activities'][0]  # Assuming you want the first activity for scheduling
-                                for assessor in assessmentActivities[activity]['Assessors']:
-                                    key = f'{date}_{assessmentType}_{activity}_{assessor}'
-                                    if key in assignments:
-                                        total_candidates_for_program += solver.Value(assignments[key]) * assessments[assessmentType]['Candidates']
-                
-                # Append the results to the DataFrame
-                candidates_per_program = assessments.get(program, {}).get('Candidates', 1)  # Default to 1 if not found
-                new_row = pd.DataFrame([{
-                    'Month': month,
-                    'Program': program,
-                    'Initial Goal': program_capacities[month_name][program]/candidates_per_program,
-                    'Final Scheduled': total_candidates_for_program/candidates_per_program,
-                    'Difference': (total_candidates_for_program/candidates_per_program)-(program_capacities[month_name][program]/candidates_per_program)
-                }]) 
-                goal_comparison_df = pd.concat([goal_comparison_df, new_row], ignore_index=True)
-              
-        # Adjust the credit per activity based on the activity type (Curious = 3, General Assessments = 5, PAPI1 = 9)
-        # Update how initial and final credits are calculated based on the program type
-        goal_comparison_df['Initial Credits'] = goal_comparison_df.apply(
-            lambda row: row['Initial Goal'] * (6 if row['Program'] == 'Curious' else 19), axis=1 #5 + 5 + 9
-        )
-        
-        goal_comparison_df['Final Credits'] = goal_comparison_df.apply(
-            lambda row: row['Final Scheduled'] * (6 if row['Program'] == 'Curious' else 19), axis=1
-        )
+    if check_calender:
+        log_message('Using calender availability for scheduling', output_text)
+    else:
+        log_message('NOT using calender availability for scheduling', output_text)
 
-        # Split the data between Curious cases and other sessions
-        curious_df = goal_comparison_df[goal_comparison_df['Program'] == 'Curious']
-        non_curious_df = goal_comparison_df[goal_comparison_df['Program'] != 'Curious']
-        
-        # Calculate total initial and final credits for Curious and non-Curious
-        total_initial_credits_curious = curious_df['Initial Credits'].sum()
-        total_final_credits_curious = curious_df['Final Credits'].sum()
-        
-        total_initial_credits_non_curious = non_curious_df['Initial Credits'].sum()
-        total_final_credits_non_curious = non_curious_df['Final Credits'].sum()
-        
-        # Calculate the success percentages for Curious and non-Curious cases
-        credits_success_percentage_curious = (total_final_credits_curious / total_initial_credits_curious) * 100 if total_initial_credits_curious > 0 else 0
-        credits_success_percentage_non_curious = (total_final_credits_non_curious / total_initial_credits_non_curious) * 100 if total_initial_credits_non_curious > 0 else 0
-        credits_success_percentage = ((total_final_credits_curious + total_final_credits_non_curious)  / (total_initial_credits_curious + total_initial_credits_non_curious)) * 100 if (total_initial_credits_curious + total_initial_credits_non_curious) > 0 else 0
-
-        # If indicated to create ICS files, check success and call makeICS
-        if credits_success_percentage >= 90 and want_ics:          
-            # Check if solutionDf is empty before calling makeICS
-            if not solutionDf.empty:
-                makeICS(solutionDf, startDate, endDate)
-            else:
-                print("The solution DataFrame is empty. No ICS files will be created.")
-                    
-        # Create a summary row with the totals and both percentages
-        summary_row = pd.DataFrame([{
-            'Month': '',  # Empty for the summary row
-            'Program': '',  # Empty for the summary row
-            'Initial Goal': '',
-            'Final Scheduled': '', 
-            'Difference': '',
-            '% Assessment Planned': round(credits_success_percentage, 2),
-            '% Curious': round(credits_success_percentage_curious, 2),
-            '% Assessment Afternoons': round(credits_success_percentage_non_curious, 2)            
-        }])
-
-        # Delete any programs where for that month the goal was 0 
-        goal_comparison_df = goal_comparison_df[goal_comparison_df['Initial Goal'] > 0]
-                
-        # Append the summary row to the goal_comparison_df
-        goal_comparison_df = pd.concat([goal_comparison_df, summary_row], ignore_index=True)
-        
-        # Optional: Adjust columns order if you want both percentages and assessor-sessions to be part of the output
-        goal_comparison_df = goal_comparison_df[['Month', 'Program', 'Initial Goal', 'Final Scheduled', 'Difference', '% Assessment Planned', '% Curious', '% Assessment Afternoons']]
+    log_message('Start scheduling...', output_text)
+
+    with report.phase('workingDays'):
+        datesResult = workingDays(startDate, endDate)
+    with report.phase('load_data'):
+        data = prepareInput(assessorExcel)
+    report.set(assessors=len(data['assessors']), programs=len(data['assessments']), working_days=len(datesResult['workingDates']))
+
+    failed = (datesResult, None)  # Dates and fixed assignments of the model to diagnose when there is no solution
+    if horizon_mode == 'month':
+        assigned, status, failedWindow = rollingHorizon(startDate, endDate, data, output_text, check_calender, constant_goal_weight, settings, overlap_months, progress,
+                                                        model_cache, report, hint_schedule, require_hr)
+        failed = failedWindow or failed
+    else:
+        built = cachedBuildModel(datesResult, data, output_text, check_calender, constant_goal_weight, model_cache=model_cache, require_hr=require_hr, report=report)
+        solver, status = solveModel(built, settings, (endDate - startDate).days, output_text, hint_schedule, progress, report)
+        with report.phase('extraction'):
+            assigned = solvedAssignments(built, solver) if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE else None
 
-    else: #No solution
-        solutionDf = pd.DataFrame()
-        capacityUsage = pd.DataFrame()
-        goal_comparison_df = pd.DataFrame()
-        scheduleText = "No solution found. \n"
+    if assigned is not None:
+        with report.phase('compile schedule'):
+            return compileSchedule(assigned, startDate, endDate, datesResult, data, output_text, want_ics)
 
-    return solutionDf, capacityUsage, goal_comparison_df, scheduleText
\ No newline at end of file
+    #No solution
+    solutionDf = pd.DataFrame()
+    capacityUsage = pd.DataFrame()
+    goal_comparison_df = pd.DataFrame()
+    scheduleText = "No solution found. \n"
+    if status == cp_model.INFEASIBLE:
+        with report.phase('diagnosis'):
+            diagnosis = diagnoseInfeasibility(failed[0], data, output_text, check_calender, fixed=failed[1], require_hr=require_hr)
+        scheduleText += "".join(f"Conflicting rule: {' '.join(str(value) for value in row if value)}\n" for row in diagnosis.itertuples(index=False))
+    return solutionDf, capacityUsage, goal_comparison_df, scheduleText
@@ -1,33 +1,94 @@
-import datetime
+from datetime import date
 from collections import defaultdict
+import re
+import numpy as np
+import openpyxl
 import pandas as pd
 
+def week_key(day):
+    # Key used to group working days per week: (ISO year, ISO week), so week 1 of two years is never merged
+    isoYear, week, _ = day.isocalendar()
+    return (isoYear, week)
+
+def month_key(day):
+    # Key used to group working days per month: (year, month), so the same month of two years is never merged
+    return (day.year, day.month)
+
+def month_label(month):
+    # (2026, 1) -> 'January 2026'
+    return f"{get_month_name(month[1])} {month[0]}"
+
+def parse_month_label(label):
+    # 'January' -> (None, 1), 'January 2026' -> (2026, 1), anything else -> (None, 0)
+    name, _, year = str(label).strip().partition(' ')
+    if year and not year.isdigit():
+        return None, 0
+    return (int(year) if year else None), get_month_number(name)
+
+def program_goal(program_capacities, month, program):
+    # Candidate goal of a program in a (year, month): the 'Candidate Goal - January 2026' row if there is one, else 'Candidate Goal - January'
+    year, number = month
+    goals = program_capacities.get(f"{get_month_name(number)} {year}", program_capacities.get(get_month_name(number), {}))
+    return goals.get(program, 0)
+
+def assessor_capacity(info, month):
+    # Capacity of an assessor in a (year, month): the 'Capacity - January 2026' row if there is one, else 'Capacity - January'
+    year, number = month
+    return info.get('YearCapacity', {}).get(f"{year}-{number:02d}", info['Capacity'].get(number, 0))
+
+def office_calendar(holidays=()):
+    # Business-day calendar of the office: Monday to Friday without the office unavailabilities ('YYYY-MM-DD' dates)
+    return np.busdaycalendar(weekmask='1111100', holidays=np.array(sorted(holidays), dtype='datetime64[D]'))
+
+def day_numbers(dates):
+    # 'YYYY-MM-DD' dates (or anything whose first 10 characters are one) -> int64 array of days since 1970-01-01, comparable with 'dayNumbers'
+    return np.array(sorted({str(day)[:10] for day in dates}), dtype='datetime64[D]').astype(np.int64)
+
 def workingDays(startDate, endDate):
-    working_dates = []
-    working_dates_with_weekdays = []
+    """
+    Calendar of the weekdays from startDate to endDate, computed on datetime64 arrays.
+    Returns the dates as strings, with their weekday (0 = Monday), and grouped per week and month (keys of week_key and month_key),
+    and the same calendar as arrays with one entry per working day, for masks computed with array operations:
+    'days' (datetime64), 'dayNumbers' (days since 1970-01-01), 'weekdays', 'weekdayMasks' (5 x days, row 0 = Mondays),
+    'weekKeys' and 'monthKeys' (days x 2, the (ISO year, week) and (year, month) of every day) and 'weekGroups' and 'monthGroups'
+    (index of the day's week / month in workingWeeks / workingMonths).
+    Office holidays stay working days, the model prunes them with office_calendar (so the consecutive-day rule still sees them as neighbours)
+    """
+    allDays = np.arange(np.datetime64(startDate, 'D'), np.datetime64(endDate, 'D') + 1)
+    days = allDays[np.is_busday(allDays, weekmask='1111100')]
+    dayNumbers = days.astype(np.int64)
+    weekday = (dayNumbers + 3) % 7  # 1970-01-01 was a Thursday
+    thursday = days - weekday + 3  # The ISO week (and its year) is that of the Thursday of the week
+    isoYear = thursday.astype('datetime64[Y]')
+    week = (thursday - isoYear.astype('datetime64[D]')).astype(np.int64) // 7 + 1
+    month = days.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    year = days.astype('datetime64[Y]').astype(np.int64) + 1970
+    weekKeys = np.column_stack([isoYear.astype(np.int64) + 1970, week]).reshape(-1, 2)  # Same keys as week_key and month_key
+    monthKeys = np.column_stack([year, month]).reshape(-1, 2)
+    # The days are sorted, so a new group starts wherever the key changes
+    weekGroups = np.concatenate([[0], np.cumsum((np.diff(weekKeys, axis=0) != 0).any(axis=1))]).astype(np.int64)[:len(days)]
+    monthGroups = np.concatenate([[0], np.cumsum((np.diff(monthKeys, axis=0) != 0).any(axis=1))]).astype(np.int64)[:len(days)]
+
+    working_dates = np.datetime_as_string(days).tolist()
     week_dates = defaultdict(list)
     month_dates = defaultdict(list)
-    current_date = startDate
-    
-    while current_date <= endDate:
-        if current_date.weekday() < 5:  # Check if it's a weekday
-            formatted_date = current_date.strftime('%Y-%m-%d')
-            working_dates.append(formatted_date)
-            working_dates_with_weekdays.append((formatted_date, current_date.weekday()))
-
-            week_number = current_date.isocalendar()[1]
-            month_number = current_date.month
-            
-            week_dates[week_number].append(formatted_date)
-            month_dates[month_number].append(formatted_date)
-        
-        current_date += datetime.timedelta(days=1)
-    
+    for day, weekKey, monthKey in zip(working_dates, map(tuple, weekKeys.tolist()), map(tuple, monthKeys.tolist())):
+        week_dates[weekKey].append(day)
+        month_dates[monthKey].append(day)
+
     return {
         'workingDates': working_dates,
-        'workingDatesWithWeekdays': working_dates_with_weekdays,
+        'workingDatesWithWeekdays': list(zip(working_dates, weekday.tolist())),
         'workingWeeks': dict(week_dates),
-        'workingMonths': dict(month_dates)
+        'workingMonths': dict(month_dates),
+        'days': days,
+        'dayNumbers': dayNumbers,
+        'weekdays': weekday,
+        'weekdayMasks': weekday == np.arange(5)[:, None],
+        'weekKeys': weekKeys,
+        'monthKeys': monthKeys,
+        'weekGroups': weekGroups,
+        'monthGroups': monthGroups
     }
 
 def get_month_number(month_name):
@@ -43,12 +104,13 @@ def get_month_name(month_number):
     }
     return month_names.get(month_number, "")
 
-def load_data(file_name):
+def load_data_pandas(file_name):
+    # Original sheet-by-sheet loader, kept to benchmark load_data against (see loaderBenchmark.py)
     xls = pd.ExcelFile(file_name)
     assessors = {}
-    candidate_goal = {}
     program_capacities = {}
     office_unavailabilities = []
+    program_definitions = {}  # Program -> overrides of its 'Activities' and 'Candidates' (see prepareInput)
 
     for sheet_name in xls.sheet_names:
         df = pd.read_excel(xls, sheet_name)
@@ -87,6 +149,7 @@ def load_data(file_name):
                     assessor_data[key] = value
             assessors[sheet_name] = assessor_data
         else:
+            programs = [column for column in df.columns if column not in ('Key', 'Value')]
             for _, row in df.iterrows():
                 key, value = row['Key'], row['Value']
                 if pd.isna(key):
@@ -94,26 +157,174 @@ def load_data(file_name):
                 if 'Candidate Goal - ' in key:
                     month = key.split('- ')[-1]
                     month_number = get_month_number(month)
-                    program_capacities[month] = {
-                        'MCP&DATA': int(row['MCP&DATA']),
-                        'AM IT': int(row['AM IT']),
-                        'Buildwise': int(row['Buildwise']),
-                        'Scrum Master': int(row['Scrum Master']),
-                        'Pluxee': int(row['Pluxee']),
-                        'Curious': int(row['Curious']),
-                        ### Future programs
-                        'Program1': int(row['Program1']),
-                        'Program2': int(row['Program2']),
-                        'Program3': int(row['Program3']),
-                        'Program4': int(row['Program4']),
-                        'Program5': int(row['Program5']),
-                        'Program6': int(row['Program6']),
-                        'Program7': int(row['Program7']),
-                        'Program8': int(row['Program8']),
-                        }
+                    # Every column after Key and Value is a program, an empty cell is no goal
+                    program_capacities[month] = {program: int(row[program]) if pd.notna(row[program]) else 0 for program in programs}
+                elif key == 'Program Activities':  # Optional: roles of an assessment of the program, e.g. "ROLEPLAY1, CASE1, PAPI1"
+                    for program in programs:
+                        if pd.notna(row[program]):
+                            program_definitions.setdefault(program, {})['Activities'] = str(row[program]).split(', ')
+                elif key == 'Program Candidates':  # Optional: candidates per assessment of the program
+                    for program in programs:
+                        if pd.notna(row[program]):
+                            program_definitions.setdefault(program, {})['Candidates'] = int(row[program])
                 elif key in ['Public Holidays', 'Office Events']:
                     if pd.notna(value):  # Check dates present
                         dates = value.split(', ')
                         office_unavailabilities.extend(dates)
            
-    return assessors, program_capacities, office_unavailabilities
\ No newline at end of file
+    return assessors, program_capacities, office_unavailabilities, program_definitions
+
+
+ASSESSOR_ACTIVITIES = ('CURIOUS', 'ROLEPLAY', 'CASE', 'PAPI')
+DATE_LIST = re.compile(r'\d{4}-\d{2}-\d{2}(, \d{4}-\d{2}-\d{2})*')
+
+def _parse_list(value):
+    # Comma separated cell as a list, numbers (weekdays) as int
+    if value is None or value == '':
+        return []
+    if isinstance(value, str):
+        return [int(v) if v.isdigit() else v for v in value.split(', ')]
+    if isinstance(value, float) and not value.is_integer():
+        # "2,4" becomes the number 2.4 in Excel with a decimal comma (e.g. Laetitia's Wednesday and Friday)
+        return [int(v) for v in str(value).replace('.', '')]
+    return [int(value) if isinstance(value, float) else value]
+
+def load_data(file_name):
+    """
+    Read the assessor workbook in one pass (read-only openpyxl, values only) into the same structures as load_data_pandas.
+    Every cell is validated while parsing and all malformed cells are reported together in one ValueError.
+    """
+    workbook = openpyxl.load_workbook(file_name, read_only=True, data_only=True, keep_links=False)
+    assessors = {}
+    program_capacities = {}
+    office_unavailabilities = []
+    program_definitions = {}  # Program -> overrides of its 'Activities' and 'Candidates' (see prepareInput)
+    problems = []  # (sheet, row, message) of every malformed cell
+
+    def dates(sheet, row, key, value):
+        # Comma separated YYYY-MM-DD dates, or a single date cell, the whole cell is checked at once
+        if value is None:
+            return []
+        if isinstance(value, date):  # Excel turned a single date into a date cell
+            return [value.strftime('%Y-%m-%d')]
+        if not isinstance(value, str):
+            problems.append((sheet, row, f"{key}: '{value}' is not a YYYY-MM-DD date"))
+            return []
+        if not DATE_LIST.fullmatch(value):
+            problems.extend((sheet, row, f"{key}: '{v}' is not a YYYY-MM-DD date") for v in value.split(', ') if not DATE_LIST.fullmatch(v))
+        return value.split(', ')
+
+    for sheet in workbook.worksheets:
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None) or ()
+        if sheet.title == 'Extra':
+            columns = {name: i for i, name in enumerate(header) if name is not None}
+            if 'Key' not in columns or 'Value' not in columns:
+                problems.append((sheet.title, 1, "the Extra sheet needs 'Key' and 'Value' columns"))
+                continue
+            programs = [name for name in columns if name not in ('Key', 'Value')]
+            for number, row in enumerate(rows, start=2):
+                cell = lambda name: row[columns[name]] if columns[name] < len(row) else None
+                key, value = cell('Key'), cell('Value')
+                if key is None:
+                    continue
+                if not isinstance(key, str):
+                    problems.append((sheet.title, number, f"key '{key}' is not text"))
+                    continue
+                if 'Candidate Goal - ' in key:
+                    month = key.split('- ')[-1]  # 'January' for every year, or 'January 2026' for one year only
+                    if not parse_month_label(month)[1]:
+                        problems.append((sheet.title, number, f"unknown month '{month}'"))
+                    goals = {}
+                    for program in programs:
+                        goal = cell(program)
+                        if goal is not None and not isinstance(goal, (int, float)):
+                            problems.append((sheet.title, number, f"goal of {program} '{goal}' is not a number"))
+                            goal = None
+                        goals[program] = int(goal) if goal is not None else 0
+                    program_capacities[month] = goals
+                elif key == 'Program Activities':
+                    for program in programs:
+                        if cell(program) is not None:
+                            program_definitions.setdefault(program, {})['Activities'] = str(cell(program)).split(', ')
+                elif key == 'Program Candidates':
+                    for program in programs:
+                        if cell(program) is not None:
+                            if not isinstance(cell(program), (int, float)):
+                                problems.append((sheet.title, number, f"candidates of {program} '{cell(program)}' is not a number"))
+                                continue
+                            program_definitions.setdefault(program, {})['Candidates'] = int(cell(program))
+                elif key in ['Public Holidays', 'Office Events']:
+                    office_unavailabilities.extend(dates(sheet.title, number, key, value))
+            continue
+
+        assessor_data = {}
+        capacityMonths = set()
+        for number, row in enumerate(rows, start=2):
+            key, value = (tuple(row) + (None, None))[:2]
+            if key is None:
+                continue
+            if not isinstance(key, str):
+                problems.append((sheet.title, number, f"key '{key}' is not text"))
+                continue
+            if key.startswith('Capacity - '):
+                # 'Capacity - January' holds for every year, 'Capacity - January 2026' overrides it for one year (see assessor_capacity)
+                year, month = parse_month_label(key.split('- ')[1])
+                if not month:
+                    problems.append((sheet.title, number, f"unknown month '{key.split('- ')[1]}'"))
+                elif not isinstance(value, (int, float)) or value < 0:
+                    problems.append((sheet.title, number, f"capacity '{value}' is not a number of at least 0"))
+                elif year:
+                    assessor_data.setdefault('YearCapacity', {})[f"{year}-{month:02d}"] = int(value)
+                else:
+                    capacityMonths.add(month)
+                    assessor_data.setdefault('Capacity', {})[month] = int(value)
+            elif key in ['Activities', 'programs']:
+                if value is not None and not isinstance(value, str):
+                    problems.append((sheet.title, number, f"{key} '{value}' should be a comma separated list of names"))
+                    value = None
+                assessor_data[key] = value.split(', ') if value else []
+                if key == 'Activities':
+                    unknown = [activity for activity in assessor_data[key] if activity not in ASSESSOR_ACTIVITIES]
+                    if unknown:
+                        problems.append((sheet.title, number, f"unknown activities {', '.join(unknown)}, choose from: {', '.join(ASSESSOR_ACTIVITIES)}"))
+            elif key in ['DATA', 'HR']:
+                if isinstance(value, bool) or value in ['TRUE', 'FALSE']:
+                    assessor_data[key] = value is True or value == 'TRUE'
+                else:
+                    problems.append((sheet.title, number, f"{key} '{value}' should be TRUE or FALSE"))
+            elif key == 'weeklyUnavailability':
+                assessor_data[key] = _parse_list(value)
+                if any(weekday not in range(5) for weekday in assessor_data[key]):
+                    problems.append((sheet.title, number, f"weeklyUnavailability '{value}' should be weekdays 0 (Monday) to 4 (Friday)"))
+            elif key in ['Unavailability', 'assessmentAvailability', 'caseAvailability']:
+                if value is None and key != 'Unavailability':
+                    print(f"No {'assessment' if key == 'assessmentAvailability' else 'case'} availability found for {sheet.title}")
+                    continue
+                assessor_data[key] = dates(sheet.title, number, key, value)
+            else:
+                assessor_data[key] = value
+        if not set(range(1, 13)) <= capacityMonths:
+            problems.append((sheet.title, None, "needs a 'Capacity - <Month>' row (without year) for all 12 months"))
+        assessors[sheet.title] = assessor_data
+    workbook.close()
+
+    if 'Extra' not in workbook.sheetnames:
+        problems.append(('Extra', None, "sheet with the candidate goals is missing"))
+    if problems:
+        raise ValueError(f"{len(problems)} malformed cells in {file_name}:\n" + "\n".join(
+            f"  - sheet '{sheet}'{f' row {row}' if row else ''}: {message}" for sheet, row, message in problems))
+    return assessors, program_capacities, office_unavailabilities, program_definitions
+
+def load_schedule_assignments(schedule):
+    # Previously exported schedule (workbook with a 'Schedule' sheet, or an in-memory solutionDf) as a set of (date, program, role, assessor)
+    if isinstance(schedule, (set, list)):
+        return set(schedule)
+    if not isinstance(schedule, pd.DataFrame):
+        schedule = pd.read_excel(schedule, sheet_name='Schedule')
+    if schedule.empty:
+        return set()
+
+    dates = pd.to_datetime(schedule['Date']).dt.strftime('%Y-%m-%d')
+    programs = schedule['Program'].replace('Curious Case', 'Curious')  # Curious cases are exported under their own label
+    return set(zip(dates, programs, schedule['Role'], schedule['Assessor']))
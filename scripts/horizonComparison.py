@@ -0,0 +1,20 @@
+import argparse
+from datetime import date
+from functionScript import compareHorizonModes
+from solverSettings import SOLVER_PRESETS, DEFAULT_PRESET
+
+# Compare runtime and objective of the monolithic solve with the month-by-month (rolling horizon) solve, e.g.:
+# python horizonComparison.py resources/assessors2025.xlsx 2025-01-01 2025-12-31 --preset "Fast draft"
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare monolithic and rolling horizon scheduling")
+    parser.add_argument('assessorExcel')
+    parser.add_argument('startDate', type=date.fromisoformat)
+    parser.add_argument('endDate', type=date.fromisoformat)
+    parser.add_argument('--preset', default=DEFAULT_PRESET, choices=list(SOLVER_PRESETS))
+    parser.add_argument('--check-calender', action='store_true')
+    parser.add_argument('--goal-weight', type=float, default=1)
+    args = parser.parse_args()
+
+    comparison = compareHorizonModes(args.startDate, args.endDate, args.assessorExcel, check_calender=args.check_calender,
+                                     constant_goal_weight=args.goal_weight, solver_settings=args.preset)
+    print(comparison.to_string(index=False))
@@ -0,0 +1,45 @@
+import hashlib
+import os
+import pickle
+from functions import load_data
+from modelCache import evict
+
+# Parsed assessor workbooks are cached on disk, keyed by the file content and the loader version, so an unchanged workbook is never parsed twice.
+# Bump INPUT_CACHE_VERSION whenever load_data changes what it returns.
+INPUT_CACHE_VERSION = 2
+INPUT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".assessment_scheduler", "inputs")
+INPUT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+def input_cache_key(file_name):
+    # Hash of the workbook bytes: a changed (or replaced) file gets a new key, whatever its name or modification time
+    digest = hashlib.sha256(f"load_data v{INPUT_CACHE_VERSION}\n".encode())
+    with open(file_name, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cached_load_data(file_name, input_cache=True, directory=INPUT_CACHE_DIR, max_bytes=INPUT_CACHE_MAX_BYTES):
+    # load_data, but the parsed result of a workbook with the same content is read from the cache instead of parsing Excel
+    if not input_cache:
+        return load_data(file_name)
+    key = input_cache_key(file_name)
+    path = os.path.join(directory, f"{key}.input")
+    try:
+        with open(path, "rb") as f:
+            parsed = pickle.load(f)
+        os.utime(path)  # Mark as recently used
+        return parsed
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    parsed = load_data(file_name)  # Malformed workbooks raise here and are never cached
+    try:
+        os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            pickle.dump(parsed, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+        evict(directory, max_bytes, suffix=".input")
+    except OSError as e:
+        print(f"Could not store the parsed workbook in the cache: {e}")
+    return parsed
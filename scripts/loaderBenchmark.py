@@ -0,0 +1,37 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import pandas as pd
+from functions import load_data, load_data_pandas
+from syntheticInstances import makeSyntheticWorkbook
+
+# Load time of the one-pass workbook loader against the original sheet-by-sheet pandas loader, e.g.:
+# python loaderBenchmark.py resources/assessors2025.xlsx --assessors 100 500 --repeat 5
+def timeLoader(loader, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(path)
+        times.append(time.perf_counter() - start)
+    return times
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the assessor workbook loaders")
+    parser.add_argument('workbooks', nargs='*', default=[])
+    parser.add_argument('--assessors', type=int, nargs='+', default=[], help="also benchmark synthetic workbooks with this many assessors")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        workbooks = list(args.workbooks) + [makeSyntheticWorkbook(os.path.join(directory, f'synthetic_{assessors}.xlsx'), assessors=assessors, programs=14)
+                                            for assessors in args.assessors]
+        rows = []
+        for path in workbooks:
+            rows.append({'Workbook': os.path.basename(path), 'Sheets': len(load_data(path)[0]) + 1})
+            for name, loader in [('pandas', load_data_pandas), ('one pass', load_data)]:
+                times = timeLoader(loader, path, args.repeat)
+                rows[-1][f'{name} (ms, median)'] = round(statistics.median(times) * 1000, 1)
+            rows[-1]['Speedup'] = round(rows[-1]['pandas (ms, median)'] / rows[-1]['one pass (ms, median)'], 1)
+        print(pd.DataFrame(rows).to_string(index=False))
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import pickle
+from ortools.sat.python import cp_model
+
+# Built models are cached on disk, keyed by the parsed input, the date range and the model options.
+# Bump MODEL_CACHE_VERSION whenever buildModel changes, so models of an older version are never reused.
+MODEL_CACHE_VERSION = 4
+MODEL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".assessment_scheduler", "models")
+MODEL_CACHE_MAX_BYTES = 500 * 1024 * 1024  # Least recently used models are removed above this size
+
+def model_cache_key(data, datesResult, check_calender, formulation, fixed=None, require_hr=False):
+    # Hash of everything buildModel depends on, except the goal weight (only the objective, rebuilt when loading)
+    content = {
+        "version": MODEL_CACHE_VERSION,
+        "data": data,
+        "dates": datesResult["workingDatesWithWeekdays"],
+        "check_calender": check_calender,
+        "formulation": formulation,
+        "fixed": sorted(fixed or []),
+        "require_hr": require_hr
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+def _path(key, directory):
+    return os.path.join(directory, f"{key}.model")
+
+def load_cached_model(key, constant_goal_weight=1, directory=MODEL_CACHE_DIR):
+    # Returns the built model dict (like buildModel) or None if the key is not cached
+    path = _path(key, directory)
+    try:
+        with open(path, "rb") as f:
+            stored = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    try:
+        os.utime(path)  # Mark as recently used
+    except OSError:  # Evicted by a concurrent run in the meantime
+        pass
+
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(stored["proto"])
+    boolVar = model.GetBoolVarFromProtoIndex
+    index = stored["index"]
+    index.bind(model)
+    built = {
+        "model": model,
+        "index": index,
+        "sessions": {key: boolVar(i) for key, i in stored["sessions"].items()},
+        "busy": {key: boolVar(i) for key, i in stored["busy"].items()},
+        "assessmentDay": {key: boolVar(i) for key, i in stored["assessmentDay"].items()},
+        "derived": [(boolVar(i), var_ids) for i, var_ids in stored["derived"]],
+        "pruned": stored["pruned"],
+        "external": [boolVar(i) for i in stored["external"]],
+        "goal_deviations": [model.GetIntVarFromProtoIndex(i) for i in stored["goal_deviations"]],
+        "guards": {},
+        # Constraint family statistics of the original build (see RunReport.add_families), else just the size of the model
+        "families": stored.get("families") or {"cached model": {"seconds": 0.0, "variables": len(model.Proto().variables),
+                                                                "constraints": len(model.Proto().constraints)}}
+    }
+    model.Minimize(sum(built["external"]) + constant_goal_weight * sum(built["goal_deviations"]))
+    return built
+
+def store_cached_model(key, built, directory=MODEL_CACHE_DIR, max_bytes=MODEL_CACHE_MAX_BYTES):
+    # Store a freshly built model (before hints or extra constraints are added to it) and evict the least recently used ones
+    stored = {
+        "proto": built["model"].Proto().SerializeToString(),
+        "index": built["index"],
+        "sessions": {key: var.Index() for key, var in built["sessions"].items()},
+        "busy": {key: var.Index() for key, var in built["busy"].items()},
+        "assessmentDay": {key: var.Index() for key, var in built["assessmentDay"].items()},
+        "derived": [(var.Index(), var_ids) for var, var_ids in built["derived"]],
+        "pruned": built["pruned"],
+        "external": [var.Index() for var in built["external"]],
+        "goal_deviations": [var.Index() for var in built["goal_deviations"]],
+        "families": built.get("families", {})
+    }
+    os.makedirs(directory, exist_ok=True)
+    path = _path(key, directory)
+    temporary = f"{path}.{os.getpid()}.tmp"  # One per process, batch runs may store the same model concurrently
+    with open(temporary, "wb") as f:
+        pickle.dump(stored, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporary, path)  # Never leave a half written model behind
+    evict(directory, max_bytes)
+
+def evict(directory=MODEL_CACHE_DIR, max_bytes=MODEL_CACHE_MAX_BYTES, suffix=".model"):
+    # Remove the least recently used files ending in suffix until the cache fits in max_bytes
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(suffix):
+            try:
+                stat = os.stat(os.path.join(directory, name))
+            except FileNotFoundError:  # Removed by a concurrent run
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+        total -= size
@@ -0,0 +1,103 @@
+import json
+import platform
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import ortools
+import pandas as pd
+
+class RunReport:
+    """
+    Timings, model statistics and solver telemetry of one scheduling run.
+    Phases and constraint families are summed over repeated calls (e.g. the windows of a month-by-month solve).
+    """
+    def __init__(self, **info):
+        self.info = {'created': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                     'ortools': ortools.__version__, 'pandas': pd.__version__}
+        self.info.update(info)
+        self.phases = {}  # name -> {'seconds', 'calls'}
+        self.families = {}  # name -> {'seconds', 'variables', 'constraints', 'calls'}
+        self.solves = []  # CP-SAT response statistics per solve
+        self._mark = None
+
+    def set(self, **info):
+        self.info.update(info)
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry = self.phases.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += time.perf_counter() - start
+            entry['calls'] += 1
+
+    def begin_families(self, model):
+        # Start measuring constraint families of a model that is being built
+        proto = model.Proto()
+        self._mark = (time.perf_counter(), len(proto.variables), len(proto.constraints))
+
+    def family(self, name, model):
+        # Time, variables and constraints added since the previous family (or begin_families)
+        proto = model.Proto()
+        now, variables, constraints = time.perf_counter(), len(proto.variables), len(proto.constraints)
+        start, startVariables, startConstraints = self._mark
+        entry = self.families.setdefault(name, {'seconds': 0.0, 'variables': 0, 'constraints': 0, 'calls': 0})
+        entry['seconds'] += now - start
+        entry['variables'] += variables - startVariables
+        entry['constraints'] += constraints - startConstraints
+        entry['calls'] += 1
+        self._mark = (now, variables, constraints)
+
+    def add_families(self, families, cached=False):
+        # Add the constraint families of a model measured by another report. A cached model brings the statistics of its original build
+        for name, stats in families.items():
+            entry = self.families.setdefault(name, {'seconds': 0.0, 'variables': 0, 'constraints': 0, 'calls': 0})
+            for key in ('seconds', 'variables', 'constraints'):
+                entry[key] += stats[key]
+            entry['calls'] += 1
+            if cached:
+                entry['cached_calls'] = entry.get('cached_calls', 0) + 1
+
+    def solve(self, solver, status, label=None):
+        response = solver.ResponseProto()
+        stats = {
+            'label': label,
+            'status': solver.StatusName(status),
+            'objective': response.objective_value,
+            'best_bound': response.best_objective_bound,
+            'wall_time': response.wall_time,
+            'user_time': response.user_time,
+            'deterministic_time': response.deterministic_time,
+            'num_booleans': response.num_booleans,
+            'num_integers': response.num_integers,
+            'num_branches': response.num_branches,
+            'num_conflicts': response.num_conflicts,
+            'num_binary_propagations': response.num_binary_propagations,
+            'num_integer_propagations': response.num_integer_propagations,
+            'num_restarts': response.num_restarts,
+            'num_lp_iterations': response.num_lp_iterations,
+            'gap_integral': response.gap_integral,
+            'solution_info': response.solution_info
+        }
+        # Presolve time and presolved model size are only in the solve log (log_to_response)
+        presolve = re.search(r'Starting presolve at ([\d.]+)s', response.solve_log)
+        search = re.search(r'Starting search at ([\d.]+)s', response.solve_log)
+        if presolve and search:
+            stats['presolve_time'] = round(float(search.group(1)) - float(presolve.group(1)), 3)
+        presolved = re.search(r"Presolved (?:optimization|satisfaction) model.*?\n#Variables: ([\d']+)", response.solve_log)
+        if presolved:
+            stats['presolved_variables'] = int(presolved.group(1).replace("'", ""))  # The log groups thousands with '
+        self.solves.append(stats)
+
+    def to_dict(self):
+        rounded = lambda entries: {name: {key: round(value, 4) if isinstance(value, float) else value for key, value in entry.items()}
+                                   for name, entry in entries.items()}
+        return {'info': self.info, 'phases': rounded(self.phases), 'constraint_families': rounded(self.families), 'solves': self.solves}
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
@@ -0,0 +1,80 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import pandas as pd
+from functionScript import makeSchedule
+from runReport import RunReport
+from solverSettings import SOLVER_PRESETS, resolve_solver_settings
+from syntheticInstances import makeSyntheticWorkbook, instanceDates
+
+def _benchmarkRun(assessorExcel, startDate, endDate, check_calender, settings):
+    # One scaling benchmark case, run in a fresh process so the peak memory is that of this case only
+    report = RunReport()
+    makeSchedule(startDate, endDate, assessorExcel, None, check_calender=check_calender, solver_settings=settings, model_cache=False, report=report)
+    solve = report.solves[-1] if report.solves else {}
+    found = solve.get('status') in ('OPTIMAL', 'FEASIBLE')
+    try:
+        import resource  # Not available on Windows
+        # ru_maxrss is in kilobytes on Linux (bytes on macOS)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        peak = None
+    return {
+        'Variables': sum(family['variables'] for family in report.families.values()),
+        'Constraints': sum(family['constraints'] for family in report.families.values()),
+        'Build Time (sec.)': round(report.phases['build model']['seconds'], 2),
+        'Solve Time (sec.)': round(report.phases['solve']['seconds'], 2),
+        'Peak Memory (MB)': round(peak, 1) if peak else None,
+        'Status': solve.get('status'),
+        'Objective': solve.get('objective') if found else None
+    }
+
+def scalingBenchmark(cases, directory, year=2025, check_calender=True, solver_settings=None, seed=0):
+    # Generate a synthetic workbook per case (dict of makeSyntheticWorkbook arguments: assessors, programs, months, goal_level, availability)
+    # into directory and schedule it headlessly, returns one row per case with model size, build and solve time, peak memory, status and objective
+    settings = resolve_solver_settings(solver_settings)
+    os.makedirs(directory, exist_ok=True)
+    rows = []
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for case in cases:
+            name = '_'.join(f'{key}{value}' for key, value in case.items())
+            assessorExcel = makeSyntheticWorkbook(os.path.join(directory, f'synthetic_{name}.xlsx'), year=year, seed=seed, **case)
+            startDate, endDate = instanceDates(year, case.get('months', 12))
+            print(f"Benchmark case {name}: {startDate} to {endDate}")
+            result = pool.submit(_benchmarkRun, assessorExcel, startDate, endDate, check_calender and case.get('availability', 0.8) is not None, settings).result()
+            rows.append({**case, **result})
+    return pd.DataFrame(rows)
+
+# Schedule synthetic workbooks over a grid of sizes and print (or save) model size, build and solve time, peak memory and objective, e.g.:
+# python scalingBenchmark.py --assessors 10 20 40 --programs 6 10 --months 3 12 --preset Benchmark --output benchmark.csv
+# Save the table of each version with --output and compare them with --compare old.csv
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scaling benchmark on synthetic assessor workbooks")
+    parser.add_argument('--assessors', type=int, nargs='+', default=[18])
+    parser.add_argument('--programs', type=int, nargs='+', default=[6])
+    parser.add_argument('--months', type=int, nargs='+', default=[3])
+    parser.add_argument('--goal-level', type=float, nargs='+', default=[1])
+    parser.add_argument('--availability', type=float, nargs='+', default=[0.8])
+    parser.add_argument('--year', type=int, default=2025)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--preset', default='Benchmark', choices=list(SOLVER_PRESETS))
+    parser.add_argument('--directory', default='benchmark_instances')
+    parser.add_argument('--output')
+    parser.add_argument('--compare')
+    args = parser.parse_args()
+
+    cases = [{'assessors': assessors, 'programs': programs, 'months': months, 'goal_level': goal_level, 'availability': availability}
+             for assessors, programs, months, goal_level, availability in product(args.assessors, args.programs, args.months, args.goal_level, args.availability)]
+    results = scalingBenchmark(cases, args.directory, year=args.year, solver_settings=args.preset, seed=args.seed)
+    print(results.to_string(index=False))
+    if args.output:
+        results.to_csv(args.output, index=False)
+    if args.compare:
+        # Side by side with an earlier run of the same grid
+        previous = pd.read_csv(args.compare)
+        merged = previous.merge(results, on=list(cases[0]), suffixes=(' (old)', ' (new)'))
+        columns = list(cases[0]) + [f'{column}{suffix}' for column in ['Status', 'Build Time (sec.)', 'Solve Time (sec.)', 'Peak Memory (MB)', 'Objective']
+                                    for suffix in (' (old)', ' (new)')]
+        print(merged[columns].to_string(index=False))
@@ -0,0 +1,76 @@
+import threading
+import time
+from ortools.sat.python import cp_model
+
+class SolveProgress(cp_model.CpSolverSolutionCallback):
+    """
+    Solution callback that streams every improved solution (objective, best bound, gap, elapsed time) to a log function
+    and keeps the latest incumbent schedule. stop() can be called from another thread (GUI) to accept the incumbent early.
+    """
+    def __init__(self, log=print):
+        super().__init__()
+        self.log = log
+        self.solutions = 0
+        self.history = []  # (elapsed sec., objective, bound) per solution
+        self.incumbent = []  # (date, program, activity, assessor) of the latest solution
+        self.stopped = False
+        self.stop_reason = None  # Set when the search is stopped by the user or the no-improvement rule
+        self.solve_info = []  # One summary dict per finished solve (see record)
+        self.last_improvement = time.monotonic()
+        self._watchdog = None
+        self._solver = None
+        self._index = None
+        self._lock = threading.Lock()
+
+    def attach(self, solver, index, no_improvement_time=None):
+        # Called before every solve: the same object follows all solves of a run (e.g. every rolling horizon window)
+        with self._lock:
+            self._solver = solver
+            self._index = index
+        self.last_improvement = time.monotonic()
+        if self.stopped:
+            solver.parameters.stop_after_first_solution = True  # Early accept also holds for the windows still to come
+        else:
+            self.stop_reason = None
+        if no_improvement_time:
+            self._watchdog = threading.Event()
+            threading.Thread(target=self._watch, args=(no_improvement_time, self._watchdog), daemon=True).start()
+
+    def detach(self):
+        with self._lock:
+            self._solver = None
+        if self._watchdog is not None:
+            self._watchdog.set()
+            self._watchdog = None
+
+    def _watch(self, no_improvement_time, done):
+        # Stop the search once a schedule exists but has not improved for no_improvement_time seconds
+        solutions = self.solutions
+        while not done.wait(0.5):
+            if self.solutions > solutions and time.monotonic() - self.last_improvement > no_improvement_time:
+                self.stop_reason = f"no improvement for {no_improvement_time:g} sec."
+                with self._lock:
+                    if self._solver is not None:
+                        self._solver.StopSearch()
+                return
+
+    def record(self, info):
+        self.solve_info.append(info)
+
+    def on_solution_callback(self):
+        self.solutions += 1
+        self.last_improvement = time.monotonic()
+        objective, bound, elapsed = self.ObjectiveValue(), self.BestObjectiveBound(), self.WallTime()
+        gap = abs(objective - bound) / max(1, abs(objective)) * 100
+        self.history.append((elapsed, objective, bound))
+        if self._index is not None:  # Attached without an index (weight sweep workers): only the no-improvement rule and the log
+            self.incumbent = list(self._index.frame(self._index.assigned_ids(self.Response())).itertuples(index=False, name=None))
+        self.log(f"Solution {self.solutions}: objective {objective:g}, bound {bound:g}, gap {gap:.1f}%, {elapsed:.1f} sec.")
+
+    def stop(self):
+        # Accept the current incumbent: the solver returns it as a FEASIBLE solution
+        self.stopped = True
+        self.stop_reason = "stopped by user"
+        with self._lock:
+            if self._solver is not None:
+                self._solver.StopSearch()
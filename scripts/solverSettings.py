@@ -0,0 +1,93 @@
+import os
+from ortools.sat.python import cp_model
+
+# Time limit of a preset is base_time + time_per_day * (days in the planning range)
+# workers = 0 lets CP-SAT use all available cores
+SOLVER_PRESETS = {
+    "Fast draft": {"workers": 0, "base_time": 30, "time_per_day": 0.25, "deterministic": False, "seed": 0, "relative_gap": 0.05, "no_improvement_time": 30},
+    "Balanced": {"workers": 0, "base_time": 120, "time_per_day": 2, "deterministic": False, "seed": 0},
+    "Thorough": {"workers": 0, "base_time": 300, "time_per_day": 4, "deterministic": False, "seed": 0, "no_improvement_time": 600},
+    "Benchmark": {"workers": 8, "base_time": 60, "time_per_day": 1, "deterministic": True, "seed": 42},
+}
+DEFAULT_PRESET = "Balanced"
+
+# Stopping rules, on top of the time limit (None = not used):
+# relative_gap / absolute_gap: stop once (objective - bound) is within this fraction / amount
+# no_improvement_time: stop when no better schedule was found for this many seconds (wall clock, also in deterministic mode)
+# hard_time_limit: wall-clock cap in seconds, whatever the time limit or deterministic mode says
+# optimal_or_bust: only accept a schedule that is proven optimal
+STOPPING_RULES = {"relative_gap": None, "absolute_gap": None, "no_improvement_time": None, "hard_time_limit": None, "optimal_or_bust": False}
+
+# Objective: 'weighted' minimizes external use + goal weight * goal shortfall in one solve,
+# 'lexicographic' first minimizes goal shortfall, then external use with that shortfall fixed (two solves)
+# phase_split: share of the time limit for the first phase, phase_hint: start the second phase from the first phase's schedule
+OBJECTIVE_MODES = ("weighted", "lexicographic")
+OBJECTIVE_DEFAULTS = {"objective": "weighted", "phase_split": 0.5, "phase_hint": True}
+
+def resolve_solver_settings(settings=None):
+    """
+    Turn a preset name or a dict of overrides (optionally with a 'preset' key) into a full settings dict
+    """
+    if settings is None:
+        settings = {}
+    elif isinstance(settings, str):
+        settings = {"preset": settings}
+
+    preset = settings.get("preset", DEFAULT_PRESET)
+    if preset not in SOLVER_PRESETS:
+        raise ValueError(f"Unknown solver preset '{preset}', choose from: {', '.join(SOLVER_PRESETS)}")
+
+    resolved = dict(STOPPING_RULES)
+    resolved.update(OBJECTIVE_DEFAULTS)
+    resolved.update(SOLVER_PRESETS[preset])
+    resolved.update({key: value for key, value in settings.items() if value is not None})
+    resolved["preset"] = preset
+    if resolved["objective"] not in OBJECTIVE_MODES:
+        raise ValueError(f"Unknown objective '{resolved['objective']}', choose from: {', '.join(OBJECTIVE_MODES)}")
+    return resolved
+
+def solver_time_limit(settings, days_difference):
+    # Time limit in seconds: an explicit time_limit or the preset formula for the planning range
+    return settings.get("time_limit") or settings["base_time"] + settings["time_per_day"] * days_difference
+
+def apply_solver_settings(solver, settings, days_difference):
+    # Configure a cp_model.CpSolver and return the time limit that was set (in seconds)
+    time_limit = solver_time_limit(settings, days_difference)
+    workers = int(settings["workers"])
+    if workers > (os.cpu_count() or 1):
+        print(f"Requested {workers} search workers on a machine with {os.cpu_count()} cores")
+
+    solver.parameters.num_workers = workers
+    solver.parameters.random_seed = int(settings["seed"])
+    if settings["deterministic"]:
+        # Deterministic time is reproducible across runs and machines, wall time is not
+        solver.parameters.interleave_search = True
+        solver.parameters.max_deterministic_time = time_limit
+    else:
+        solver.parameters.max_time_in_seconds = time_limit
+    if settings["hard_time_limit"]:
+        solver.parameters.max_time_in_seconds = min(solver.parameters.max_time_in_seconds, settings["hard_time_limit"])
+    if settings["relative_gap"] is not None:
+        solver.parameters.relative_gap_limit = settings["relative_gap"]
+    if settings["absolute_gap"] is not None:
+        solver.parameters.absolute_gap_limit = settings["absolute_gap"]
+    solver.parameters.log_search_progress = settings.get("log_search_progress", False)
+    return time_limit
+
+def stop_reason(solver, status, settings, progress=None):
+    # Human readable reason why a solve ended
+    if progress is not None and progress.stop_reason:
+        return progress.stop_reason
+    if status == cp_model.OPTIMAL:
+        if solver.ObjectiveValue() == solver.BestObjectiveBound():
+            return "proven optimal"
+        return "gap target reached"
+    if status == cp_model.INFEASIBLE:
+        return "proven infeasible"
+    if status == cp_model.MODEL_INVALID:
+        return "invalid model"
+    if settings["hard_time_limit"] and solver.WallTime() >= settings["hard_time_limit"]:
+        limit = "hard time limit"
+    else:
+        limit = "deterministic time limit" if settings["deterministic"] else "time limit"
+    return f"{limit} reached" + ("" if status == cp_model.FEASIBLE else " without a schedule")
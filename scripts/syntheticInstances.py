@@ -0,0 +1,88 @@
+import calendar
+import random
+from datetime import date, timedelta
+import pandas as pd
+from functions import get_month_name
+
+# Programs in the column order of the 'Extra' sheet that load_data reads (Curious first, so small instances always have one)
+PROGRAMS = ['Curious', 'MCP&DATA', 'AM IT', 'Buildwise', 'Scrum Master', 'Pluxee',
+            'Program1', 'Program2', 'Program3', 'Program4', 'Program5', 'Program6', 'Program7', 'Program8']
+
+# Activity profiles of the assessors in assessors2025.xlsx, drawn at random for synthetic assessors
+ACTIVITY_PROFILES = [['CURIOUS'], ['ROLEPLAY'], ['CASE'], ['PAPI'], ['ROLEPLAY', 'CASE'], ['ROLEPLAY', 'CASE', 'PAPI'],
+                     ['CURIOUS', 'ROLEPLAY', 'CASE', 'PAPI']]
+CAPACITIES = [5, 10, 12, 15, 16, 20]
+PUBLIC_HOLIDAYS = ['01-01', '05-01', '07-21', '08-15', '11-01', '11-11', '12-25']
+
+def instanceDates(year, months):
+    # First and last day of a synthetic instance that plans `months` months from January of `year` (more than 12 runs into the next years)
+    endYear, endMonth = year + (months - 1) // 12, (months - 1) % 12 + 1
+    return date(year, 1, 1), date(endYear, endMonth, calendar.monthrange(endYear, endMonth)[1])
+
+def makeSyntheticWorkbook(path, assessors=18, programs=6, months=12, goal_level=1, availability=0.8, year=2025, seed=0):
+    """
+    Write a random assessor workbook in the format of resources/assessors2025.xlsx.
+    assessors: number of assessors besides 'External', programs: number of PROGRAMS with a candidate goal,
+    months: goals are set for the first `months` months from January of `year` (the planning horizon, see instanceDates),
+    a horizon of 12 months or more sets the goals of every month, so the 'Candidate Goal - <Month>' rows hold for every year,
+    goal_level: assessments per program per month (goal = goal_level * candidates per assessment),
+    availability: share of working days in the assessmentAvailability/caseAvailability rows (used with check_calender), None to leave them out
+    """
+    if not 1 <= programs <= len(PROGRAMS):
+        raise ValueError(f"programs must be between 1 and {len(PROGRAMS)}")
+    if months < 1:
+        raise ValueError("months must be at least 1")
+    rng = random.Random(seed)
+    laterRng = random.Random(seed + 1)  # Availability after the first year, so the first year is the same for every horizon
+    enabled = PROGRAMS[:programs]
+    startDate, endDate = instanceDates(year, max(months, 12))
+    years = range(startDate.year, endDate.year + 1)
+    days = [startDate + timedelta(days=i) for i in range((endDate - startDate).days + 1)]
+    workingDates = [day for day in days if day.weekday() < 5]
+
+    def available(weekday):
+        # Random share of the working days on the given weekdays
+        return ', '.join([str(day) for day in workingDates if day.year == year and weekday(day.weekday()) and rng.random() < availability]
+                         + [str(day) for day in workingDates if day.year > year and weekday(day.weekday()) and laterRng.random() < availability])
+
+    sheets = {}
+    for number in range(1, assessors + 1):
+        activities = rng.choice(ACTIVITY_PROFILES)
+        # Curious is only possible with CURIOUS, the other programs with any other activity
+        possible = [program for program in enabled if ('CURIOUS' in activities if program == 'Curious' else activities != ['CURIOUS'])]
+        if not possible:
+            possible = enabled
+        rows = [
+            ('Activities', ', '.join(activities)),
+            ('HR', 'TRUE' if rng.random() < 0.35 else 'FALSE'),
+            ('DATA', 'TRUE' if rng.random() < 0.35 else 'FALSE'),
+            ('programs', ', '.join(rng.sample(possible, min(len(possible), rng.randint(1, 3))))),
+            ('weeklyUnavailability', rng.randrange(5) if rng.random() < 0.25 else None),
+        ]
+        if availability is not None:
+            # Same weekdays as availability.py: assessment afternoons Monday to Thursday, cases Monday, Tuesday, Thursday and Friday
+            rows.append(('assessmentAvailability', available(lambda weekday: weekday < 4)))
+            rows.append(('caseAvailability', available(lambda weekday: weekday != 2)))
+        rows.append(('Unavailability', None))
+        capacity = rng.choice(CAPACITIES)
+        rows += [(f'Capacity - {get_month_name(month)}', capacity) for month in range(1, 13)]
+        sheets[f'Assessor {number:03d}'] = pd.DataFrame(rows, columns=['Key', 'Value'])
+
+    # 'External' can do everything and is always available, as in the real workbook
+    sheets['External'] = pd.DataFrame([('Activities', 'CURIOUS, ROLEPLAY, CASE, PAPI'), ('HR', 'FALSE'), ('DATA', 'FALSE'),
+                                       ('programs', ', '.join(enabled)), ('weeklyUnavailability', None), ('Unavailability', None)]
+                                      + [(f'Capacity - {get_month_name(month)}', 100) for month in range(1, 13)], columns=['Key', 'Value'])
+
+    candidates = {'Curious': 1}
+    extra = [{'Key': 'Public Holidays', 'Value': ', '.join(f'{holidayYear}-{day}' for holidayYear in years for day in PUBLIC_HOLIDAYS)}, {'Key': 'Office Events', 'Value': None}]
+    for month in range(1, 13):
+        row = {'Key': f'Candidate Goal - {get_month_name(month)}', 'Value': None}
+        for program in PROGRAMS:
+            row[program] = round(goal_level * candidates.get(program, 3)) if program in enabled and month <= months else 0
+        extra.append(row)
+    sheets['Extra'] = pd.DataFrame(extra, columns=['Key', 'Value'] + PROGRAMS)
+
+    with pd.ExcelWriter(path, engine='xlsxwriter') as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+    return path
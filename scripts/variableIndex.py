@@ -0,0 +1,123 @@
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+class VariableIndex:
+    """
+    Integer-indexed store for the assignment variables of the scheduling model.
+    Every BoolVar gets an id, its date/program/activity/assessor are kept as integer ids in parallel lists
+    and the groupings the constraint families need are filled once while the variables are created.
+    """
+    def __init__(self, dates, months, programs, activities, assessors):
+        self.dates = list(dates)
+        self.programs = list(programs)
+        self.activities = list(activities)
+        self.assessors = list(assessors)
+
+        self.date_id = {date: i for i, date in enumerate(self.dates)}
+        self.program_id = {program: i for i, program in enumerate(self.programs)}
+        self.activity_id = {activity: i for i, activity in enumerate(self.activities)}
+        self.assessor_id = {assessor: i for i, assessor in enumerate(self.assessors)}
+
+        # Month key of every date id (same keys as the months dict of workingDays)
+        self.date_month = [None] * len(self.dates)
+        for month, monthDates in months.items():
+            for date in monthDates:
+                if date in self.date_id:
+                    self.date_month[self.date_id[date]] = month
+
+        # Columnar storage: position i describes variable i
+        self.vars = []
+        self.var_date = []
+        self.var_program = []
+        self.var_activity = []
+        self.var_assessor = []
+        self.var_index = []  # Position of variable i in the model proto, to read a whole solution at once
+        self.lookup = {}  # (date id, program id, activity id, assessor id) -> variable id
+
+        # Groupings reused by the constraint families (lists of variable ids)
+        self.by_assessor_date = defaultdict(list)
+        self.by_date_program = defaultdict(list)
+        self.by_date_program_activity = defaultdict(list)
+        self.by_assessor_month = defaultdict(list)
+
+    def __len__(self):
+        return len(self.vars)
+
+    def __getstate__(self):
+        # The BoolVars belong to a model and are not stored, bind() recreates them from var_index
+        state = self.__dict__.copy()
+        state['vars'] = None
+        return state
+
+    def bind(self, model):
+        # Point the variables at a model that was loaded from its serialized proto
+        self.vars = [model.GetBoolVarFromProtoIndex(i) for i in self.var_index]
+
+    def add(self, model, date, program, activity, assessor):
+        d = self.date_id[date]
+        p = self.program_id[program]
+        a = self.activity_id[activity]
+        s = self.assessor_id[assessor]
+
+        var_id = len(self.vars)
+        self.vars.append(model.NewBoolVar(f'{date}_{program}_{activity}_{assessor}'))
+        self.var_index.append(self.vars[-1].Index())
+        self.var_date.append(d)
+        self.var_program.append(p)
+        self.var_activity.append(a)
+        self.var_assessor.append(s)
+        self.lookup[(d, p, a, s)] = var_id
+
+        self.by_assessor_date[(s, d)].append(var_id)
+        self.by_date_program[(d, p)].append(var_id)
+        self.by_date_program_activity[(d, p, a)].append(var_id)
+        self.by_assessor_month[(s, self.date_month[d])].append(var_id)
+        return var_id
+
+    def get(self, date, program, activity, assessor):
+        # Returns the variable id or None if the assignment was never created
+        key = (self.date_id.get(date), self.program_id.get(program), self.activity_id.get(activity), self.assessor_id.get(assessor))
+        return self.lookup.get(key)
+
+    def select(self, var_ids):
+        return [self.vars[i] for i in var_ids]
+
+    def key(self, var_id):
+        # Translate a variable id back to its (date, program, activity, assessor) labels
+        return (self.dates[self.var_date[var_id]],
+                self.programs[self.var_program[var_id]],
+                self.activities[self.var_activity[var_id]],
+                self.assessors[self.var_assessor[var_id]])
+
+    def assigned_ids(self, response):
+        # Ids of the variables set to 1 in a CpSolverResponse (solver.ResponseProto() or Response() in a callback), in one batch
+        solution = np.asarray(response.solution, dtype=np.int64)
+        if len(solution) == 0:  # No solution found
+            return np.array([], dtype=np.int64)
+        return np.flatnonzero(solution[np.asarray(self.var_index, dtype=np.int64)])
+
+    def frame(self, var_ids):
+        # Date, Program, Role and Assessor labels of the given variable ids as columns
+        var_ids = np.asarray(var_ids, dtype=np.int64)
+        return pd.DataFrame({
+            'Date': np.asarray(self.dates, dtype=object)[np.asarray(self.var_date, dtype=np.int64)[var_ids]],
+            'Program': np.asarray(self.programs, dtype=object)[np.asarray(self.var_program, dtype=np.int64)[var_ids]],
+            'Role': np.asarray(self.activities, dtype=object)[np.asarray(self.var_activity, dtype=np.int64)[var_ids]],
+            'Assessor': np.asarray(self.assessors, dtype=object)[np.asarray(self.var_assessor, dtype=np.int64)[var_ids]]
+        })
+
+    def add_hints(self, model, assigned, derived=()):
+        # Hint every assignment variable with 1 if its (date, program, activity, assessor) is in assigned, else 0
+        # derived: optional (BoolVar, variable ids) pairs, e.g. session or busy literals, hinted 1 if any of their assignments is
+        hinted = [0] * len(self.vars)
+        for date, program, activity, assessor in assigned:
+            var_id = self.get(date, program, activity, assessor)
+            if var_id is not None:
+                hinted[var_id] = 1
+
+        for var, value in zip(self.vars, hinted):
+            model.AddHint(var, value)
+        for literal, var_ids in derived:
+            model.AddHint(literal, int(any(hinted[i] for i in var_ids)))
+        return sum(hinted)
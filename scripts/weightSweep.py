@@ -0,0 +1,21 @@
+import argparse
+from datetime import date
+from functionScript import weightSweep, SWEEP_WEIGHTS
+from solverSettings import SOLVER_PRESETS, DEFAULT_PRESET
+
+# Solve several goal weights at once and print the Pareto front of external days against goal fulfilment, e.g.:
+# python weightSweep.py resources/assessors2025.xlsx 2025-01-01 2025-06-30 --weights 0.001 0.5 1 3 --preset "Fast draft"
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Weight sweep: trade-off between external assessors and candidate goals")
+    parser.add_argument('assessorExcel')
+    parser.add_argument('startDate', type=date.fromisoformat)
+    parser.add_argument('endDate', type=date.fromisoformat)
+    parser.add_argument('--weights', type=float, nargs='+', default=list(SWEEP_WEIGHTS))
+    parser.add_argument('--preset', default=DEFAULT_PRESET, choices=list(SOLVER_PRESETS))
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--check-calender', action='store_true')
+    args = parser.parse_args()
+
+    front, schedules = weightSweep(args.startDate, args.endDate, args.assessorExcel, check_calender=args.check_calender, weights=args.weights,
+                                   solver_settings=args.preset, processes=args.processes)
+    print(front.to_string(index=False))
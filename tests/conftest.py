@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+# The scripts are run from their own directory and import each other by module name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+ICS = ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:test\r\n"
+       "BEGIN:VEVENT\r\nUID:{name}\r\nDTSTART;TZID=Europe/Paris:20250106T090000\r\nDTEND;TZID=Europe/Paris:20250106T170000\r\n"
+       "SUMMARY:Busy {name}\r\nX-MICROSOFT-CDO-BUSYSTATUS:BUSY\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n")
+
+class ICSServer:
+    """
+    Local stand-in for the Outlook calendar links: every path is a feed with an optional delay, a number of 503 answers before it
+    works, a fixed status, and ETag / Last-Modified headers that answer conditional requests with 304.
+    """
+    def __init__(self):
+        self.feeds = {}  # name -> {'body', 'delay', 'fail', 'status', 'etag', 'last_modified'}
+        self.requests = []  # (name, status) of every answer
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                feed = server.feeds[self.path.strip('/')]
+                time.sleep(feed['delay'])
+                if feed['fail'] > 0:
+                    feed['fail'] -= 1
+                    status = 503
+                elif feed['status'] != 200:
+                    status = feed['status']
+                elif (feed['etag'] and self.headers.get('If-None-Match') == feed['etag']) or \
+                        (not feed['etag'] and feed['last_modified'] and self.headers.get('If-Modified-Since') == feed['last_modified']):
+                    status = 304
+                else:
+                    status = 200
+                server.requests.append((self.path.strip('/'), status))
+                body = feed['body'].encode() if status == 200 else b''
+                self.send_response(status)
+                if feed['etag']:
+                    self.send_header('ETag', feed['etag'])
+                if feed['last_modified']:
+                    self.send_header('Last-Modified', feed['last_modified'])
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def add(self, name, delay=0.0, fail=0, status=200, etag='"v1"', last_modified='Mon, 06 Jan 2025 08:00:00 GMT', body=None):
+        self.feeds[name] = {'body': body or ICS.format(name=name), 'delay': delay, 'fail': fail, 'status': status, 'etag': etag,
+                            'last_modified': last_modified}
+        return self.url(name)
+
+    def url(self, name):
+        return f'http://127.0.0.1:{self.httpd.server_port}/{name}'
+
+    def hits(self, name):
+        return [status for feed, status in self.requests if feed == name]
+
+@pytest.fixture
+def ics_server():
+    server = ICSServer()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
@@ -0,0 +1,52 @@
+import json
+import time
+from datetime import date
+import pandas as pd
+import availability
+from availability import fetch_calenders
+from syntheticInstances import makeSyntheticWorkbook
+
+def test_feeds_are_downloaded_concurrently(ics_server):
+    calenders = {f'Assessor {i}': ics_server.add(f'a{i}', delay=0.5) for i in range(8)}
+    lines = []
+    start = time.perf_counter()
+    feeds = fetch_calenders(calenders, list(calenders), lines.append, workers=8, feed_cache=False)
+    elapsed = time.perf_counter() - start
+
+    assert all(feeds[name] and 'BEGIN:VCALENDAR' in feeds[name] for name in calenders)
+    assert elapsed < 2.0  # 8 x 0.5 sec. one after another
+    assert sum('downloaded' in line for line in lines) == 8
+    assert lines[-1].startswith('Retrieved 8 of 8 calenders')
+
+def test_503_is_retried(ics_server):
+    calenders = {'Flaky': ics_server.add('flaky', fail=1)}
+    feeds = fetch_calenders(calenders, ['Flaky'], lambda message: None, feed_cache=False)
+
+    assert feeds['Flaky'] is not None
+    assert ics_server.hits('flaky') == [503, 200]
+
+def test_404_is_reported_and_not_retried(ics_server):
+    calenders = {'Missing': ics_server.add('missing', status=404)}
+    lines = []
+    feeds = fetch_calenders(calenders, ['Missing'], lines.append, feed_cache=False)
+
+    assert feeds['Missing'] is None
+    assert ics_server.hits('missing') == [404]
+    assert any('Missing could not be downloaded' in line for line in lines)
+
+def test_failed_calender_falls_back_to_full_availability(ics_server, tmp_path, monkeypatch):
+    template = makeSyntheticWorkbook(str(tmp_path / 'template.xlsx'), assessors=2, availability=None)
+    (tmp_path / 'resources').mkdir()
+    with open(tmp_path / 'resources' / 'calenders.json', 'w') as f:
+        json.dump({'Assessor 001': ics_server.add('a1'), 'Assessor 002': ics_server.add('a2', status=404)}, f)
+    monkeypatch.setattr(availability, 'base_path', str(tmp_path))
+    lines = []
+
+    output = availability.retrieve_calenders(template, lines.append, date(2025, 1, 6), date(2025, 1, 10), output_file=str(tmp_path / 'out.xlsx'),
+                                             feed_cache=False)
+
+    rows = {name: dict(zip(sheet['Key'], sheet['Value'])) for name, sheet in pd.read_excel(output, sheet_name=None).items() if name != 'Extra'}
+    # Busy all of Monday the 6th, free the rest of the week
+    assert rows['Assessor 001']['assessmentAvailability'] == '2025-01-07, 2025-01-08, 2025-01-09'
+    assert rows['Assessor 002']['assessmentAvailability'].split(', ')[0] == '2025-01-06'
+    assert 'Calender of Assessor 002 could not be downloaded: Assume full availability' in lines
@@ -0,0 +1,69 @@
+from datetime import date
+import numpy as np
+from functionScript import buildModel, prepareInput
+from functions import assessor_capacity, day_numbers, month_key, month_label, office_calendar, parse_month_label, program_goal, week_key, workingDays
+from syntheticInstances import makeSyntheticWorkbook
+
+def test_calendar_arrays_match_the_working_dates():
+    calendar = workingDays(date(2025, 12, 24), date(2026, 1, 6))
+
+    assert calendar['workingDates'] == ['2025-12-24', '2025-12-25', '2025-12-26', '2025-12-29', '2025-12-30', '2025-12-31', '2026-01-01',
+                                        '2026-01-02', '2026-01-05', '2026-01-06']
+    assert np.datetime_as_string(calendar['days']).tolist() == calendar['workingDates']
+    assert calendar['dayNumbers'].tolist() == day_numbers(calendar['workingDates']).tolist()
+    assert calendar['weekdays'].tolist() == [weekday for _, weekday in calendar['workingDatesWithWeekdays']]
+    assert calendar['weekdayMasks'][2].tolist() == [True] + [False] * 4 + [True] + [False] * 4
+    assert [tuple(key) for key in calendar['weekKeys'].tolist()] == [(2025, 52)] * 3 + [(2026, 1)] * 5 + [(2026, 2)] * 2
+    assert [tuple(key) for key in calendar['monthKeys'].tolist()] == [(2025, 12)] * 6 + [(2026, 1)] * 4
+    assert calendar['weekGroups'].tolist() == [0] * 3 + [1] * 5 + [2] * 2
+    assert calendar['monthGroups'].tolist() == [0] * 6 + [1] * 4
+    assert list(calendar['workingMonths']) == [(2025, 12), (2026, 1)]
+
+def test_weekend_only_range_is_empty():
+    calendar = workingDays(date(2025, 1, 4), date(2025, 1, 5))
+
+    assert calendar['workingDates'] == []
+    assert calendar['weekdayMasks'].shape == (5, 0)
+    assert calendar['monthKeys'].shape == (0, 2)
+
+def test_office_calendar_closes_the_holidays():
+    calendar = workingDays(date(2025, 12, 22), date(2025, 12, 26))
+
+    assert np.is_busday(calendar['days'], busdaycal=office_calendar(['2025-12-25', '2025-12-26'])).tolist() == [True, True, True, False, False]
+
+def test_months_of_different_years_are_kept_apart():
+    calendar = workingDays(date(2025, 1, 30), date(2026, 1, 2))
+
+    assert list(calendar['workingMonths'])[0] == (2025, 1) and list(calendar['workingMonths'])[-1] == (2026, 1)
+    assert calendar['workingMonths'][(2025, 1)] == ['2025-01-30', '2025-01-31']
+    assert calendar['workingMonths'][(2026, 1)] == ['2026-01-01', '2026-01-02']
+    assert week_key(date(2025, 12, 29)) == week_key(date(2026, 1, 2)) == (2026, 1)  # ISO week 1 of 2026 starts in December
+    assert week_key(date(2025, 1, 2)) == (2025, 1)
+    assert month_key(date(2025, 12, 31)) == (2025, 12) and month_key(date(2026, 1, 1)) == (2026, 1)
+    assert month_label((2026, 1)) == 'January 2026'
+    assert parse_month_label('January 2026') == (2026, 1)
+    assert parse_month_label('January') == (None, 1)
+    assert parse_month_label('January next') == (None, 0)
+
+def test_year_specific_goal_and_capacity_rows():
+    program_capacities = {'January': {'Curious': 4}, 'January 2026': {'Curious': 2}, 'December': {'Curious': 3}}
+    info = {'Capacity': {1: 10, 12: 8}, 'YearCapacity': {'2026-01': 5}}
+
+    assert program_goal(program_capacities, (2025, 1), 'Curious') == 4
+    assert program_goal(program_capacities, (2026, 1), 'Curious') == 2
+    assert program_goal(program_capacities, (2025, 12), 'Curious') == 3
+    assert program_goal(program_capacities, (2026, 1), 'Pluxee') == 0
+    assert assessor_capacity(info, (2025, 1)) == 10
+    assert assessor_capacity(info, (2026, 1)) == 5
+    assert assessor_capacity(info, (2025, 12)) == 8
+    assert assessor_capacity({'Capacity': {1: 10}}, (2026, 1)) == 10
+
+def test_model_uses_the_goal_of_the_right_january(tmp_path):
+    data = prepareInput(makeSyntheticWorkbook(str(tmp_path / 'assessors.xlsx'), assessors=6, programs=2, availability=None), input_cache=False)
+    data['program_capacities'] = {'December': {'Curious': 0, 'MCP&DATA': 0}, 'January': {'Curious': 0, 'MCP&DATA': 0},
+                                  'January 2026': {'Curious': 0, 'MCP&DATA': 6}}
+
+    built = buildModel(workingDays(date(2025, 12, 22), date(2026, 1, 9)), data, lambda message: None)
+
+    assert built['index'].programs == ['MCP&DATA']
+    assert {d for d, _ in built['sessions']} == set(range(8, 15))  # The January days only
@@ -0,0 +1,28 @@
+from datetime import date
+import pytest
+from functions import workingDays
+from functionScript import buildModel, diagnoseModel, prepareInput
+from syntheticInstances import makeSyntheticWorkbook
+
+@pytest.fixture
+def noHrData(tmp_path):
+    data = prepareInput(makeSyntheticWorkbook(str(tmp_path / 'assessors.xlsx'), assessors=6, programs=2, availability=None), input_cache=False)
+    for info in data['assessors'].values():
+        info['HR'] = False
+    return data
+
+def test_session_without_hr_assessor_is_diagnosed(noHrData):
+    datesResult = workingDays(date(2025, 1, 6), date(2025, 1, 10))
+    built = buildModel(datesResult, noHrData, lambda message: None, require_hr=True, diagnose=True)
+    (d, p), session = next(iter(built['sessions'].items()))
+    built['model'].Add(session == 1)  # Hold the session anyway
+
+    diagnosis = diagnoseModel(built, lambda message: None)
+
+    assert diagnosis.to_dict('records') == [{'Rule': 'HR member per assessment', 'Assessor / Program': built['index'].programs[p], 'Month': 'January 2025'}]
+
+def test_feasible_model_has_no_conflicting_rules(noHrData):
+    datesResult = workingDays(date(2025, 1, 6), date(2025, 1, 10))
+    built = buildModel(datesResult, noHrData, lambda message: None, require_hr=True, diagnose=True)
+
+    assert diagnoseModel(built, lambda message: None, time_limit=5).empty
@@ -0,0 +1,72 @@
+import functools
+import availability
+from availability import calender_session, fetch_calenders
+from feedCache import cached_fetch_feed, load_cached_feed
+
+def fetch(url, directory, **options):
+    with calender_session(retries=0) as session:
+        return cached_fetch_feed(session, url, timeout=5, directory=str(directory), **options)
+
+def test_fresh_feed_is_not_requested(ics_server, tmp_path):
+    url = ics_server.add('a')
+    assert fetch(url, tmp_path)[1] == 'downloaded'
+    text, source = fetch(url, tmp_path)
+
+    assert source == 'fresh'
+    assert 'BEGIN:VCALENDAR' in text
+    assert ics_server.hits('a') == [200]
+
+def test_expired_feed_is_revalidated_with_etag(ics_server, tmp_path):
+    url = ics_server.add('a')
+    fetch(url, tmp_path)
+    text, source = fetch(url, tmp_path, ttl=0)
+
+    assert source == 'not modified'
+    assert 'BEGIN:VCALENDAR' in text
+    assert ics_server.hits('a') == [200, 304]
+
+def test_expired_feed_is_revalidated_with_last_modified(ics_server, tmp_path):
+    url = ics_server.add('a', etag=None)
+    fetch(url, tmp_path)
+
+    assert fetch(url, tmp_path, ttl=0)[1] == 'not modified'
+    assert ics_server.hits('a') == [200, 304]
+
+def test_changed_feed_is_downloaded_again(ics_server, tmp_path):
+    url = ics_server.add('a')
+    fetch(url, tmp_path)
+    ics_server.add('a', etag='"v2"', body=ics_server.feeds['a']['body'].replace('Busy', 'Changed'))
+    text, source = fetch(url, tmp_path, ttl=0)
+
+    assert source == 'downloaded'
+    assert 'Changed' in text
+    assert load_cached_feed(url, str(tmp_path))['etag'] == '"v2"'
+
+def test_force_refresh_downloads_in_full(ics_server, tmp_path):
+    url = ics_server.add('a')
+    fetch(url, tmp_path)
+
+    assert fetch(url, tmp_path, force_refresh=True)[1] == 'downloaded'
+    assert ics_server.hits('a') == [200, 200]
+
+def test_cached_copy_is_used_when_the_server_fails(ics_server, tmp_path):
+    url = ics_server.add('a')
+    fetch(url, tmp_path)
+    ics_server.feeds['a']['status'] = 500
+
+    assert fetch(url, tmp_path, ttl=0)[1] == 'stale'
+    assert fetch(url, tmp_path, force_refresh=True)[1] == 'stale'
+
+def test_cache_statistics_are_logged(ics_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(availability, 'cached_fetch_feed', functools.partial(cached_fetch_feed, directory=str(tmp_path)))
+    calenders = {'Fresh': ics_server.add('fresh'), 'Unchanged': ics_server.add('unchanged')}
+    fetch_calenders(calenders, ['Fresh'], lambda message: None)
+    fetch_calenders(calenders, ['Unchanged'], lambda message: None, ttl=0)
+    lines = []
+
+    fetch_calenders(calenders, ['Fresh', 'Unchanged'], lines.append, ttl=60)
+
+    assert lines[-1] == 'Calender cache: 2 fresh, 0 not modified, 0 downloaded, 0 stale, 0 failed'
+    lines.clear()
+    fetch_calenders(calenders, ['Fresh', 'Unchanged'], lines.append, ttl=0)
+    assert lines[-1] == 'Calender cache: 0 fresh, 2 not modified, 0 downloaded, 0 stale, 0 failed'
@@ -0,0 +1,53 @@
+import openpyxl
+import pytest
+import inputCache
+from inputCache import cached_load_data
+from syntheticInstances import makeSyntheticWorkbook
+
+@pytest.fixture
+def loads(monkeypatch):
+    # Paths that were really parsed (cache misses)
+    parsed = []
+    original = inputCache.load_data
+    def load_data(file_name):
+        parsed.append(file_name)
+        return original(file_name)
+    monkeypatch.setattr(inputCache, 'load_data', load_data)
+    return parsed
+
+def test_unchanged_workbook_is_parsed_once(tmp_path, loads):
+    path = makeSyntheticWorkbook(str(tmp_path / 'assessors.xlsx'), assessors=3, programs=2)
+    first = cached_load_data(path, directory=str(tmp_path / 'cache'))
+
+    assert cached_load_data(path, directory=str(tmp_path / 'cache')) == first
+    assert loads == [path]
+
+def test_edited_workbook_misses_the_cache(tmp_path, loads):
+    path = makeSyntheticWorkbook(str(tmp_path / 'assessors.xlsx'), assessors=3, programs=2)
+    cached_load_data(path, directory=str(tmp_path / 'cache'))
+    workbook = openpyxl.load_workbook(path)
+    workbook['Assessor 001'].append(['HR', 'TRUE'])  # Same file name, new content
+    workbook.save(path)
+
+    assessors = cached_load_data(path, directory=str(tmp_path / 'cache'))[0]
+
+    assert assessors['Assessor 001']['HR'] is True
+    assert loads == [path, path]
+
+def test_malformed_workbook_is_never_cached(tmp_path, loads):
+    path = makeSyntheticWorkbook(str(tmp_path / 'assessors.xlsx'), assessors=3, programs=2)
+    workbook = openpyxl.load_workbook(path)
+    workbook['Assessor 001'].append(['HR', 'maybe'])
+    workbook.save(path)
+
+    for _ in range(2):
+        with pytest.raises(ValueError, match="HR 'maybe' should be TRUE or FALSE"):
+            cached_load_data(path, directory=str(tmp_path / 'cache'))
+    assert loads == [path, path]
+
+def test_cache_can_be_bypassed(tmp_path, loads):
+    path = makeSyntheticWorkbook(str(tmp_path / 'assessors.xlsx'), assessors=3, programs=2)
+    cached_load_data(path, directory=str(tmp_path / 'cache'))
+    cached_load_data(path, input_cache=False)
+
+    assert loads == [path, path]
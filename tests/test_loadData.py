@@ -0,0 +1,80 @@
+from datetime import datetime
+import openpyxl
+import pytest
+from functions import _parse_list, load_data
+
+MONTHS = ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December']
+
+def writeWorkbook(path, assessors, extra):
+    # assessors: sheet name -> (key, value) rows, extra: rows of the Extra sheet below its header
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in assessors.items():
+        sheet = workbook.create_sheet(name)
+        sheet.append(['Key', 'Value'])
+        for month in MONTHS:
+            sheet.append([f'Capacity - {month}', 10])
+        for row in rows:
+            sheet.append(list(row))
+    if extra is not None:
+        sheet = workbook.create_sheet('Extra')
+        sheet.append(['Key', 'Value', 'Curious', 'MCP&DATA'])
+        for row in extra:
+            sheet.append(list(row))
+    workbook.save(path)
+    return str(path)
+
+def test_workbook_is_parsed(tmp_path):
+    path = writeWorkbook(tmp_path / 'assessors.xlsx', {
+        'Anna': [('Capacity - January 2026', 3), ('Activities', 'ROLEPLAY, CASE'), ('programs', 'MCP&DATA, Curious'), ('DATA', 'TRUE'), ('HR', True),
+                 ('weeklyUnavailability', 2.4), ('Unavailability', datetime(2025, 3, 5)), ('assessmentAvailability', '2025-01-06, 2025-01-07'),
+                 ('caseAvailability', None)],
+    }, [('Candidate Goal - January', None, 4, None), ('Candidate Goal - January 2026', None, 2, 6), ('Program Candidates', None, None, 3),
+        ('Program Activities', None, None, 'ROLEPLAY1, CASE1'), ('Public Holidays', '2025-12-25, 2026-01-01'), ('Office Events', datetime(2025, 7, 21))])
+
+    assessors, program_capacities, office_unavailabilities, program_definitions = load_data(path)
+
+    assert assessors == {'Anna': {
+        'Capacity': {month: 10 for month in range(1, 13)}, 'YearCapacity': {'2026-01': 3}, 'Activities': ['ROLEPLAY', 'CASE'],
+        'programs': ['MCP&DATA', 'Curious'], 'DATA': True, 'HR': True, 'weeklyUnavailability': [2, 4], 'Unavailability': ['2025-03-05'],
+        'assessmentAvailability': ['2025-01-06', '2025-01-07']}}
+    assert program_capacities == {'January': {'Curious': 4, 'MCP&DATA': 0}, 'January 2026': {'Curious': 2, 'MCP&DATA': 6}}
+    assert office_unavailabilities == ['2025-12-25', '2026-01-01', '2025-07-21']
+    assert program_definitions == {'MCP&DATA': {'Candidates': 3, 'Activities': ['ROLEPLAY1', 'CASE1']}}
+
+def test_malformed_cells_are_reported_together(tmp_path):
+    path = writeWorkbook(tmp_path / 'assessors.xlsx', {
+        'Anna': [(5, 'TRUE'), ('Capacity - Janvier', 3), ('Activities', 'ROLEPLAY, JUGGLING'), ('HR', 'yes'), ('weeklyUnavailability', 6),
+                 ('Unavailability', 42), ('assessmentAvailability', '2025-01-06, 06/01/2025')],
+    }, [(7, None), ('Candidate Goal - January', None, 'many', 2)])
+
+    with pytest.raises(ValueError) as error:
+        load_data(path)
+
+    assert str(error.value) == f"""9 malformed cells in {path}:
+  - sheet 'Anna' row 14: key '5' is not text
+  - sheet 'Anna' row 15: unknown month 'Janvier'
+  - sheet 'Anna' row 16: unknown activities JUGGLING, choose from: CURIOUS, ROLEPLAY, CASE, PAPI
+  - sheet 'Anna' row 17: HR 'yes' should be TRUE or FALSE
+  - sheet 'Anna' row 18: weeklyUnavailability '6' should be weekdays 0 (Monday) to 4 (Friday)
+  - sheet 'Anna' row 19: Unavailability: '42' is not a YYYY-MM-DD date
+  - sheet 'Anna' row 20: assessmentAvailability: '06/01/2025' is not a YYYY-MM-DD date
+  - sheet 'Extra' row 2: key '7' is not text
+  - sheet 'Extra' row 3: goal of Curious 'many' is not a number"""
+
+def test_missing_sheet_and_capacity_months_are_reported(tmp_path):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = 'Anna'
+    workbook.active.append(['Key', 'Value'])
+    workbook.active.append(['Capacity - January', 10])
+    workbook.save(tmp_path / 'assessors.xlsx')
+
+    with pytest.raises(ValueError, match="2 malformed cells") as error:
+        load_data(str(tmp_path / 'assessors.xlsx'))
+
+    assert "sheet 'Anna': needs a 'Capacity - <Month>' row (without year) for all 12 months" in str(error.value)
+    assert "sheet 'Extra': sheet with the candidate goals is missing" in str(error.value)
+
+@pytest.mark.parametrize('value, expected', [(None, []), ('', []), ('1, 3', [1, 3]), (2, [2]), (3.0, [3]), (2.4, [2, 4]), ('Friday', ['Friday'])])
+def test_parse_list(value, expected):
+    assert _parse_list(value) == expected
@@ -0,0 +1,72 @@
+import os
+from datetime import date
+import pytest
+from ortools.sat.python import cp_model
+import modelCache
+from functions import workingDays
+from functionScript import buildModel, prepareInput
+from modelCache import evict, load_cached_model, model_cache_key, store_cached_model
+from runReport import RunReport
+from syntheticInstances import makeSyntheticWorkbook
+
+@pytest.fixture(scope='module')
+def data(tmp_path_factory):
+    path = makeSyntheticWorkbook(str(tmp_path_factory.mktemp('input') / 'assessors.xlsx'), assessors=6, programs=2)
+    return prepareInput(path, input_cache=False)
+
+@pytest.fixture
+def dates():
+    return workingDays(date(2025, 1, 6), date(2025, 1, 17))
+
+def test_key_changes_with_every_model_input(data, dates):
+    key = model_cache_key(data, dates, False, 'session')
+    changedData = dict(data, officeUnavailabilities=data['officeUnavailabilities'] + ['2025-01-08'])
+
+    assert model_cache_key(data, workingDays(date(2025, 1, 6), date(2025, 1, 17)), False, 'session') == key
+    assert len({key, model_cache_key(changedData, dates, False, 'session'), model_cache_key(data, workingDays(date(2025, 1, 6), date(2025, 1, 16)), False, 'session'),
+                model_cache_key(data, dates, True, 'session'), model_cache_key(data, dates, False, 'linear'),
+                model_cache_key(data, dates, False, 'session', fixed=[('2025-01-03', 'Curious', 'CURIOUS1', 'External')]),
+                model_cache_key(data, dates, False, 'session', require_hr=True)}) == 7
+
+def test_version_bump_invalidates_the_cache(data, dates, tmp_path, monkeypatch):
+    key = model_cache_key(data, dates, False, 'session')
+    store_cached_model(key, buildModel(dates, data, lambda message: None), str(tmp_path))
+    monkeypatch.setattr(modelCache, 'MODEL_CACHE_VERSION', modelCache.MODEL_CACHE_VERSION + 1)
+
+    newKey = model_cache_key(data, dates, False, 'session')
+
+    assert newKey != key
+    assert load_cached_model(newKey, directory=str(tmp_path)) is None
+    assert load_cached_model(key, directory=str(tmp_path)) is not None
+
+def test_cached_model_solves_like_the_built_one(data, dates, tmp_path):
+    report = RunReport()
+    built = buildModel(dates, data, lambda message: None, constant_goal_weight=2, report=report)
+    built['families'] = report.families
+    key = model_cache_key(data, dates, False, 'session')
+    store_cached_model(key, built, str(tmp_path))
+
+    cached = load_cached_model(key, constant_goal_weight=2, directory=str(tmp_path))
+
+    assert len(cached['index']) == len(built['index'])
+    assert cached['families'] == report.families
+    assert set(cached['sessions']) == set(built['sessions'])
+    objectives = []
+    for model in (built['model'], cached['model']):
+        solver = cp_model.CpSolver()
+        solver.parameters.num_workers = 1
+        assert solver.Solve(model) == cp_model.OPTIMAL
+        objectives.append(solver.ObjectiveValue())
+    assert objectives[0] == objectives[1]
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    for age, name in enumerate(['new.model', 'used.model', 'old.model', 'other.input']):
+        (tmp_path / name).write_bytes(b'x' * 100)
+        os.utime(tmp_path / name, (1000 - age, 1000 - age))
+    os.utime(tmp_path / 'used.model')  # What load_cached_model does on a hit
+
+    evict(str(tmp_path), max_bytes=200)
+
+    assert sorted(os.listdir(tmp_path)) == ['new.model', 'other.input', 'used.model']
+    evict(str(tmp_path), max_bytes=100)
+    assert sorted(os.listdir(tmp_path)) == ['other.input', 'used.model']